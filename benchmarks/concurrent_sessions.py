@@ -0,0 +1,75 @@
+"""Scoring throughput and tail latency with many sessions scoring at once.
+
+Each simulated session does what a dashboard user does between reruns: a run
+of single-customer predictions (predictor / what-if sliders) and one batch of
+a few thousand rows (priority list). All sessions share one model, as they do
+in the Streamlit process. Compares calling the shared booster directly — one
+OpenMP team of every core per call — with src.inference's InferenceExecutor.
+
+Run from the repo root:  python -m benchmarks.concurrent_sessions
+"""
+import os
+import threading
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from src.features import RAW_FEATURES, feature_matrix
+from src.inference import get_booster, get_executor
+
+warnings.filterwarnings('ignore')
+
+SESSIONS = [1, 4, 16, 32]
+ROUNDS = 5
+SINGLES_PER_ROUND = 40
+BATCH_ROWS = 5000
+
+
+def run(predict, n_sessions, singles, batch):
+    single_latencies = [[] for _ in range(n_sessions)]
+
+    def session(i):
+        for _ in range(ROUNDS):
+            for row in singles:
+                start = time.perf_counter()
+                predict(row)
+                single_latencies[i].append((time.perf_counter() - start) * 1e6)
+            predict(batch)
+
+    threads = [threading.Thread(target=session, args=(i,)) for i in range(n_sessions)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    rows = n_sessions * ROUNDS * (len(singles) + len(batch))
+    return rows / elapsed, np.concatenate(single_latencies)
+
+
+def main():
+    test_df = pd.read_csv('data/raw/test_data.csv')
+    batch = feature_matrix(test_df[RAW_FEATURES].sample(BATCH_ROWS, replace=True, random_state=42))
+    singles = [feature_matrix(test_df[RAW_FEATURES].iloc[[i]]) for i in range(SINGLES_PER_ROUND)]
+
+    booster = get_booster()
+    executor = get_executor()
+    # Both paths must agree before their speed means anything
+    assert np.allclose(booster.inplace_predict(batch), executor.predict(batch), atol=1e-6)
+
+    print(f"{os.cpu_count()} cores; executor: {executor.batch_slots} batch slots x "
+          f"{executor.batch_threads} threads, single rows on 1 thread\n")
+    print(f"{'Sessions':>8}  {'Path':<18} {'rows/s':>10} {'single p50 (us)':>16} {'single p99 (us)':>16}")
+    print("-" * 74)
+    for n_sessions in SESSIONS:
+        for name, predict in [('Shared booster', booster.inplace_predict),
+                              ('InferenceExecutor', executor.predict)]:
+            throughput, latencies = run(predict, n_sessions, singles, batch)
+            print(f"{n_sessions:>8}  {name:<18} {throughput:>10,.0f} "
+                  f"{np.percentile(latencies, 50):>16.0f} {np.percentile(latencies, 99):>16.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""Feature engineering: the old `data.copy()` pipeline vs src.features.
+
+Times both on a single customer and on a large synthetic upload, and reports
+the peak memory each one allocates on top of the input frame.
+
+Run from the repo root:  python -m benchmarks.feature_engineering [n_rows]
+"""
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from src.features import FEATURE_ORDER, RAW_FEATURES, feature_matrix, fill_row
+
+
+def legacy_engineer_features(data):
+    """The Batch Analysis implementation before src.features existed."""
+    data = data.copy()
+    data['engagement_score'] = data['HourSpendOnApp'] * data['OrderCount']
+    data['order_frequency'] = data['OrderCount'] / (data['DaySinceLastOrder'] + 1)
+    data['cashback_per_order'] = data['CashbackAmount'] / (data['OrderCount'] + 1)
+    data['is_new_customer'] = (data['Tenure'] < 3).astype(int)
+    data['high_risk'] = ((data['Complain'] == 1) & (data['SatisfactionScore'] <= 2)).astype(int)
+    data['device_loyalty'] = data['NumberOfDeviceRegistered']
+    return data
+
+
+def legacy_matrix(data):
+    # XGBoost converts the selected frame to float32 before predicting
+    return legacy_engineer_features(data)[FEATURE_ORDER].to_numpy(dtype=np.float32)
+
+
+def measure(fn, *args, repeat=3):
+    """Best wall time in ms and peak traced allocation in MB."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    fn(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best * 1000, peak / 2**20
+
+
+def main():
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    sample = pd.read_csv('data/raw/sample_upload.csv')
+    data = sample.sample(n_rows, replace=True, random_state=42).reset_index(drop=True)
+
+    assert np.array_equal(legacy_matrix(data.head(10_000)), feature_matrix(data.head(10_000)))
+
+    print(f"Batch of {n_rows:,} rows")
+    print(f"{'Pipeline':<30} {'time (ms)':>10} {'peak (MB)':>10}")
+    print("-" * 52)
+    for name, fn in [('data.copy() + select', legacy_matrix), ('src.features.feature_matrix', feature_matrix)]:
+        ms, mb = measure(fn, data)
+        print(f"{name:<30} {ms:>10.1f} {mb:>10.1f}")
+
+    raw = sample[RAW_FEATURES].iloc[0].to_dict()
+    one = pd.DataFrame([raw])
+    row = np.empty(len(FEATURE_ORDER), dtype=np.float32)
+    n_calls = 2000
+    print(f"\nSingle customer ({n_calls} calls)")
+    print(f"{'Pipeline':<30} {'per call (us)':>14}")
+    print("-" * 45)
+    for name, fn in [('data.copy() + select', lambda: legacy_matrix(one)),
+                     ('src.features.fill_row', lambda: fill_row(raw, row))]:
+        start = time.perf_counter()
+        for _ in range(n_calls):
+            fn()
+        print(f"{name:<30} {(time.perf_counter() - start) / n_calls * 1e6:>14.1f}")
+
+
+if __name__ == '__main__':
+    main()
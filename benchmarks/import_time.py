@@ -0,0 +1,115 @@
+"""Cold-load import cost of every page, with a regression budget.
+
+Each page is run once with Streamlit's AppTest in a fresh interpreter under
+`python -X importtime`. Modules Streamlit itself (and AppTest) already pulls
+in are subtracted, so what is left is what opening that page adds to a new
+server process: the page's own imports plus anything its first render
+imports. Data artifacts (feather cache, cohort cube, evaluation) are built
+up front, so the numbers are for a warm disk and a cold process.
+
+benchmarks/import_budget.json sets each page's limit in milliseconds and the
+heavy packages it must not import at all; `--check` exits non-zero if any
+page breaks its budget.
+
+Run from the repo root:
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --check
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+BUDGET_PATH = Path(__file__).resolve().parent / 'import_budget.json'
+PAGES = ['streamlit_app.py'] + sorted(str(p.relative_to(ROOT)) for p in (ROOT / 'pages').glob('*.py'))
+
+PREAMBLE = "import streamlit; from streamlit.testing.v1 import AppTest"
+RUN_PAGE = "AppTest.from_file({path!r}, default_timeout=120).run()"
+
+# "import time:       123 |        456 |   package.module"
+_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+def import_times(code: str) -> dict:
+    """Module -> self import time in microseconds for running `code` in a fresh interpreter."""
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=ROOT, env=env,
+                          capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr[-2000:])
+    times = {}
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            times[match.group(4)] = int(match.group(1))
+    return times
+
+
+def page_report(page: str, baseline: dict) -> dict:
+    times = import_times(f"{PREAMBLE}; {RUN_PAGE.format(path=str(ROOT / page))}")
+    added = {module: us for module, us in times.items() if module not in baseline}
+    packages = {}
+    for module, us in added.items():
+        top = module.split('.')[0]
+        packages[top] = packages.get(top, 0) + us
+    return {
+        'ms': sum(added.values()) / 1000,
+        'modules': sorted(added),
+        'packages': dict(sorted(packages.items(), key=lambda kv: -kv[1]))
+    }
+
+
+def imports_package(modules: list, package: str) -> bool:
+    return any(m == package or m.startswith(package + '.') for m in modules)
+
+
+def warm_artifacts() -> None:
+    # The disk artifacts pages read — build them here so their one-off cost is not counted
+    sys.path.insert(0, str(ROOT))
+    from src.cohort import load_cube
+    from src.evaluation import load_evaluation
+    load_cube()
+    load_evaluation()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-page cold import cost and budget check.")
+    parser.add_argument('--check', action='store_true', help="exit 1 if any page is over budget")
+    parser.add_argument('--top', type=int, default=4, help="heaviest packages shown per page")
+    args = parser.parse_args()
+
+    budget = json.loads(BUDGET_PATH.read_text())
+    warm_artifacts()
+    baseline = import_times(PREAMBLE)
+
+    failures = []
+    print(f"{'Page':<32} {'import ms':>10} {'budget':>8} {'modules':>8}  heaviest packages (ms)")
+    print("-" * 110)
+    for page in PAGES:
+        report = page_report(page, baseline)
+        limits = budget['pages'].get(page, {})
+        max_ms = limits.get('max_ms', budget['default_max_ms'])
+        forbidden = [pkg for pkg in limits.get('forbid', budget['default_forbid'])
+                     if imports_package(report['modules'], pkg)]
+        heaviest = ', '.join(f"{pkg} {us / 1000:.0f}" for pkg, us in list(report['packages'].items())[:args.top])
+        flag = ' ✗' if report['ms'] > max_ms or forbidden else ''
+        print(f"{page:<32} {report['ms']:>10.0f} {max_ms:>8} {len(report['modules']):>8}  {heaviest}{flag}")
+        if report['ms'] > max_ms:
+            failures.append(f"{page}: {report['ms']:.0f} ms of imports, budget {max_ms} ms")
+        for pkg in forbidden:
+            failures.append(f"{page}: imports {pkg}")
+
+    if failures:
+        print("\nOver budget:\n  " + "\n  ".join(failures))
+        if args.check:
+            sys.exit(1)
+    else:
+        print("\nEvery page is within its import budget")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""Model load time: the old joblib pickle vs the native XGBoost formats.
+
+The pickle is the scikit-learn XGBClassifier the app used to ship, rebuilt
+from the served native model into a temporary directory (pass --pickle to
+time a real legacy file instead). Each format is loaded LOADS times in this
+process after the libraries are imported, so the numbers are deserialization
+cost only; the native UBJSON path is timed both bare and through
+src.model_store.load_booster, which also reads and checks the manifest.
+
+Run from the repo root:  python -m benchmarks.model_load
+"""
+import argparse
+import tempfile
+import time
+import warnings
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+from src.features import RAW_FEATURES, feature_matrix
+from src.inference import MODEL_PATH
+from src.model_store import load_booster
+
+warnings.filterwarnings('ignore')
+
+LOADS = 50
+
+
+def native_booster(path):
+    booster = xgb.Booster()
+    booster.load_model(path)
+    return booster
+
+
+def time_loads(load, path):
+    """Return per-load times in milliseconds, and the last loaded model."""
+    timings = np.empty(LOADS)
+    for i in range(LOADS):
+        start = time.perf_counter()
+        model = load(path)
+        timings[i] = (time.perf_counter() - start) * 1000
+    return timings, model
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pickle vs native model load time.")
+    parser.add_argument('--pickle', type=Path, default=None, help="a legacy pickled XGBClassifier to time")
+    args = parser.parse_args()
+
+    test_df = pd.read_csv('data/raw/test_data.csv')
+    matrix = feature_matrix(test_df[RAW_FEATURES])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pickle_path = args.pickle
+        if pickle_path is None:
+            classifier = xgb.XGBClassifier()
+            classifier.load_model(MODEL_PATH)
+            pickle_path = Path(tmp) / 'best_churn_model.pkl'
+            joblib.dump(classifier, pickle_path)
+        json_path = Path(tmp) / 'churn_model.json'
+        native_booster(MODEL_PATH).save_model(json_path)
+
+        paths = [
+            ('joblib pickle (XGBClassifier)', joblib.load, pickle_path),
+            ('native JSON', native_booster, json_path),
+            ('native UBJSON', native_booster, MODEL_PATH),
+            ('UBJSON + manifest checks', load_booster, MODEL_PATH)
+        ]
+        print(f"{LOADS} loads each\n")
+        print(f"{'Format':<30} {'size (KB)':>10} {'p50 (ms)':>9} {'p99 (ms)':>9} {'mean (ms)':>10}")
+        print("-" * 72)
+        expected = None
+        for name, load, path in paths:
+            timings, model = time_loads(load, path)
+            booster = model.get_booster() if hasattr(model, 'get_booster') else model
+            probs = booster.inplace_predict(matrix)
+            # Every format must score the test set identically
+            if expected is None:
+                expected = probs
+            assert np.array_equal(probs, expected), name
+            print(f"{name:<30} {path.stat().st_size / 1024:>10.0f} {np.percentile(timings, 50):>9.2f} "
+                  f"{np.percentile(timings, 99):>9.2f} {timings.mean():>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
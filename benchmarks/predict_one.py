@@ -0,0 +1,85 @@
+"""Per-call latency of single-customer scoring.
+
+Compares the old page path (one-row DataFrame + predict_proba) with the
+NumPy fast path in src.inference.predict_one, with the prediction cache
+bypassed and with it warm.
+
+Run from the repo root:  python -m benchmarks.predict_one
+"""
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from src.features import FEATURE_ORDER, RAW_FEATURES
+from src.inference import MODEL_PATH, predict_one, prediction_cache
+
+warnings.filterwarnings('ignore')
+
+N_CALLS = 2000
+
+
+def dataframe_predict(model, raw):
+    """The per-rerun path the pages used before the fast path."""
+    row = dict(raw)
+    row['engagement_score'] = raw['HourSpendOnApp'] * raw['OrderCount']
+    row['order_frequency'] = raw['OrderCount'] / (raw['DaySinceLastOrder'] + 1)
+    row['cashback_per_order'] = raw['CashbackAmount'] / (raw['OrderCount'] + 1)
+    row['is_new_customer'] = 1 if raw['Tenure'] < 3 else 0
+    row['high_risk'] = 1 if (raw['Complain'] == 1 and raw['SatisfactionScore'] <= 2) else 0
+    row['device_loyalty'] = raw['NumberOfDeviceRegistered']
+    return model.predict_proba(pd.DataFrame([row])[FEATURE_ORDER])[0][1]
+
+
+def classifier():
+    """The scikit-learn wrapper the pages used to unpickle, loaded from the native model."""
+    import xgboost as xgb
+
+    model = xgb.XGBClassifier()
+    model.load_model(MODEL_PATH)
+    return model
+
+
+def time_calls(fn, customers):
+    """Return per-call latencies in microseconds."""
+    timings = np.empty(len(customers))
+    for i, raw in enumerate(customers):
+        start = time.perf_counter()
+        fn(raw)
+        timings[i] = (time.perf_counter() - start) * 1e6
+    return timings
+
+
+def main():
+    model = classifier()
+    test_df = pd.read_csv('data/raw/test_data.csv')
+    customers = test_df[RAW_FEATURES].sample(N_CALLS, replace=True, random_state=42).to_dict('records')
+
+    # Both paths must agree before their speed means anything
+    for raw in customers[:200]:
+        assert abs(dataframe_predict(model, raw) - predict_one(raw)) < 1e-6
+
+    def uncached(raw):
+        prediction_cache.clear()
+        return predict_one(raw)
+
+    old = time_calls(lambda raw: dataframe_predict(model, raw), customers)
+    new = time_calls(uncached, customers)
+    for raw in customers:
+        predict_one(raw)
+    cached = time_calls(predict_one, customers)
+
+    print(f"{'Path':<28} {'p50 (us)':>10} {'p99 (us)':>10} {'mean (us)':>10}")
+    print("-" * 61)
+    for name, t in [('DataFrame + predict_proba', old),
+                    ('NumPy row + inplace_predict', new),
+                    ('Prediction cache hit', cached)]:
+        print(f"{name:<28} {np.percentile(t, 50):>10.1f} {np.percentile(t, 99):>10.1f} {t.mean():>10.1f}")
+    print(f"\nSpeedup (p50): {np.percentile(old, 50) / np.percentile(new, 50):.1f}x uncached, "
+          f"{np.percentile(old, 50) / np.percentile(cached, 50):.1f}x cached over {N_CALLS} calls")
+    print(f"Cache: {prediction_cache.stats()}")
+
+
+if __name__ == '__main__':
+    main()
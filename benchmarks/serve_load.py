@@ -0,0 +1,81 @@
+"""Throughput and latency of the HTTP scoring service under concurrent clients.
+
+Starts src.serve in-process on a free port for each latency window, then has
+N_CLIENTS threads send single-customer requests back to back. Reports
+client-side throughput and p50/p99 latency, and the server's micro-batch
+size histogram, so the window can be tuned against the tail it costs.
+
+Run from the repo root:  python -m benchmarks.serve_load
+"""
+import http.client
+import json
+import threading
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from src.features import RAW_FEATURES
+from src.inference import predict_batch
+from src.serve import make_server
+
+warnings.filterwarnings('ignore')
+
+N_CLIENTS = 16
+REQUESTS_PER_CLIENT = 200
+WINDOWS_MS = [0.0, 1.0, 2.0, 5.0]
+
+
+def client(port, customers, latencies, out):
+    # One keep-alive connection per client, like a CRM worker calling in a loop
+    conn = http.client.HTTPConnection('127.0.0.1', port)
+    for raw in customers:
+        body = json.dumps(raw)
+        start = time.perf_counter()
+        conn.request('POST', '/predict', body, {'Content-Type': 'application/json'})
+        out.append(json.loads(conn.getresponse().read())['churn_probability'])
+        latencies.append((time.perf_counter() - start) * 1000)
+    conn.close()
+
+
+def run(window_ms, customers):
+    server = make_server(port=0, window_ms=window_ms)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    latencies, results = [], [[] for _ in range(N_CLIENTS)]
+    threads = [threading.Thread(target=client,
+                                args=(server.server_port, customers[i::N_CLIENTS], latencies, results[i]))
+               for i in range(N_CLIENTS)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    server.shutdown()
+    server.server_close()
+    return elapsed, np.array(latencies), results, server.batcher.stats.report()
+
+
+def main():
+    test_df = pd.read_csv('data/raw/test_data.csv')
+    sample = test_df[RAW_FEATURES].sample(N_CLIENTS * REQUESTS_PER_CLIENT, replace=True, random_state=42)
+    customers = [{k: (None if pd.isna(v) else float(v)) for k, v in row.items()}
+                 for row in sample.to_dict('records')]
+    expected = predict_batch(sample.to_numpy(dtype=np.float64))
+
+    print(f"{N_CLIENTS} clients x {REQUESTS_PER_CLIENT} single-customer requests\n")
+    print(f"{'Window (ms)':>11} {'req/s':>8} {'p50 (ms)':>9} {'p99 (ms)':>9} {'rows/batch':>11}  batch sizes")
+    print("-" * 90)
+    for window_ms in WINDOWS_MS:
+        elapsed, latencies, results, report = run(window_ms, customers)
+        # Batched answers must match scoring each client's rows directly
+        for i, probs in enumerate(results):
+            assert np.allclose(probs, expected[i::N_CLIENTS], atol=1e-6)
+        print(f"{window_ms:>11.1f} {len(latencies) / elapsed:>8.0f} {np.percentile(latencies, 50):>9.2f} "
+              f"{np.percentile(latencies, 99):>9.2f} {report['batch_size']['mean_rows']:>11.2f}  "
+              f"{report['batch_size']['histogram']}")
+
+
+if __name__ == '__main__':
+    main()
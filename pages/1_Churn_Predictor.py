@@ -1,28 +1,22 @@
 import streamlit as st
 import pandas as pd
-import joblib
 import plotly.graph_objects as go
-import shap
+from src.explain import explain_one
+from src.inference import get_model, predict_one
 import warnings
 warnings.filterwarnings('ignore')
 
 st.set_page_config(page_title="Churn Predictor", page_icon="🔮", layout="wide")
 
-@st.cache_resource
 def load_model():
     try:
-        return joblib.load('src/best_churn_model.pkl')
+        return get_model()
     except Exception as e:
         st.error(f"Model loading failed: {e}")
         return None
 
-@st.cache_resource
-def load_explainer(_model):
-    return shap.TreeExplainer(_model)
-
 with st.spinner("Loading AI Model..."):
     model = load_model()
-    explainer = load_explainer(model)
 
 if model is None:
     st.stop()
@@ -75,7 +69,7 @@ annual_revenue = st.sidebar.number_input("Customer Annual Revenue (₹)", 0, 500
 predict_btn = st.sidebar.button("🔮 Predict Churn", type="primary")
 
 def get_input():
-    return pd.DataFrame([{
+    return {
         'Tenure': tenure,
         'PreferredLoginDevice': preferred_login,
         'CityTier': city_tier,
@@ -93,14 +87,8 @@ def get_input():
         'CouponUsed': coupon_used,
         'OrderCount': order_count,
         'DaySinceLastOrder': day_since_last_order,
-        'CashbackAmount': cashback_amount,
-        'engagement_score': hour_spend_on_app * order_count,
-        'order_frequency': order_count / (day_since_last_order + 1),
-        'cashback_per_order': cashback_amount / (order_count + 1),
-        'is_new_customer': 1 if tenure < 3 else 0,
-        'high_risk': 1 if (complain == 1 and satisfaction_score <= 2) else 0,
-        'device_loyalty': devices_registered
-    }])
+        'CashbackAmount': cashback_amount
+    }
 
 def create_gauge(prob):
     fig = go.Figure(go.Indicator(
@@ -127,16 +115,11 @@ def create_gauge(prob):
     fig.update_layout(height=300, margin=dict(l=20, r=20, t=40, b=20))
     return fig
 
-def create_shap_chart(input_df):
-    shap_values = explainer.shap_values(input_df)
-    if isinstance(shap_values, list):
-        sv = shap_values[1][0]
-    else:
-        sv = shap_values[0]
-    feature_names = input_df.columns.tolist()
+def create_shap_chart(input_row):
+    sv = explain_one(input_row)
     shap_df = pd.DataFrame({
-        'Feature': feature_names,
-        'SHAP Value': sv
+        'Feature': sv.index,
+        'SHAP Value': sv.values
     }).sort_values('SHAP Value', key=abs, ascending=False).head(10)
     colors = ['#ff4444' if v > 0 else '#44bb44' for v in shap_df['SHAP Value']]
     fig = go.Figure(go.Bar(
@@ -182,8 +165,8 @@ def get_health_score(prob):
 
 if predict_btn:
     with st.spinner("Analyzing customer profile..."):
-        input_df = get_input()
-        prob = model.predict_proba(input_df)[0][1]
+        input_row = get_input()
+        prob = predict_one(input_row)
         health_score = get_health_score(prob)
         reasons = get_churn_reasons()
 
@@ -249,7 +232,7 @@ if predict_btn:
     st.subheader("🧠 Live SHAP Explanation — Why This Customer?")
     st.markdown("*Real-time explanation from XGBoost model showing exactly which factors drive this prediction*")
     with st.spinner("Calculating SHAP values..."):
-        shap_fig = create_shap_chart(input_df)
+        shap_fig = create_shap_chart(input_row)
     st.plotly_chart(shap_fig, use_container_width=True)
     st.caption("Red bars = factors INCREASING churn risk | Green bars = factors DECREASING churn risk")
 
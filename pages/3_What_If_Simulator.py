@@ -1,16 +1,15 @@
 import streamlit as st
 import pandas as pd
-import joblib
 import plotly.graph_objects as go
+from src.inference import get_model, predict_many
 import warnings
 warnings.filterwarnings('ignore')
 
 st.set_page_config(page_title="What-If Simulator", page_icon="🔄", layout="wide")
 
-@st.cache_resource
 def load_model():
     try:
-        return joblib.load('src/best_churn_model.pkl')
+        return get_model()
     except Exception as e:
         st.error(f"Model loading failed: {e}")
         return None
@@ -47,54 +46,40 @@ with col4:
     city_tier = st.selectbox("City Tier", [1, 2, 3], index=2)
     number_of_address = st.slider("Number of Address", 1, 22, 2)
 
-def make_prediction(ten, sat, comp, cash, coup, orders, days, hours, dev, addr):
-    return pd.DataFrame([{
-        'Tenure': ten,
-        'PreferredLoginDevice': 2,
-        'CityTier': city_tier,
-        'WarehouseToHome': 30,
-        'PreferredPaymentMode': 1,
-        'Gender': 1,
-        'HourSpendOnApp': hours,
-        'NumberOfDeviceRegistered': dev,
-        'PreferedOrderCat': 3,
-        'SatisfactionScore': sat,
-        'MaritalStatus': 2,
-        'NumberOfAddress': addr,
-        'Complain': comp,
-        'OrderAmountHikeFromlastYear': 11,
-        'CouponUsed': coup,
-        'OrderCount': orders,
-        'DaySinceLastOrder': days,
-        'CashbackAmount': cash,
-        'engagement_score': hours * orders,
-        'order_frequency': orders / (days + 1),
-        'cashback_per_order': cash / (orders + 1),
-        'is_new_customer': 1 if ten < 3 else 0,
-        'high_risk': 1 if (comp == 1 and sat <= 2) else 0,
-        'device_loyalty': dev
-    }])
-
-current_prob = model.predict_proba(
-    make_prediction(tenure, satisfaction, complain, cashback,
-                   coupon, order_count, day_since, hour_spend,
-                   devices, number_of_address))[0][1]
-
-# Current status
-st.divider()
-st.subheader("📊 Current Churn Probability")
-col1, col2, col3 = st.columns(3)
-col1.metric("Current Churn Risk", f"{current_prob*100:.1f}%")
-col2.metric("Health Score", f"{int((1-current_prob)*100)}/100")
-if current_prob >= 0.6:
-    col3.metric("Risk Level", "🔴 HIGH RISK")
-    st.error(f"🚨 This customer has {current_prob*100:.1f}% chance of churning — immediate action needed!")
-elif current_prob >= 0.3:
-    col3.metric("Risk Level", "🟡 MEDIUM RISK")
-    st.warning(f"⚠️ This customer has {current_prob*100:.1f}% chance of churning — schedule outreach")
-else:
-    col3.metric("Risk Level", "🟢 LOW RISK")
-    st.success(f"✅ This customer has {current_prob*100:.1f}% chance of churning — keep engaging")
+# Fixed profile fields — the simulator only varies the inputs above
+customer = {
+    'Tenure': tenure,
+    'PreferredLoginDevice': 2,
+    'CityTier': city_tier,
+    'WarehouseToHome': 30,
+    'PreferredPaymentMode': 1,
+    'Gender': 1,
+    'HourSpendOnApp': hour_spend,
+    'NumberOfDeviceRegistered': devices,
+    'PreferedOrderCat': 3,
+    'SatisfactionScore': satisfaction,
+    'MaritalStatus': 2,
+    'NumberOfAddress': number_of_address,
+    'Complain': complain,
+    'OrderAmountHikeFromlastYear': 11,
+    'CouponUsed': coupon,
+    'OrderCount': order_count,
+    'DaySinceLastOrder': day_since,
+    'CashbackAmount': cashback
+}
+
+# Single retention actions compared below — each entry overrides some of the customer's inputs
+INTERVENTIONS = [
+    ("Resolve Complaint", {'Complain': 0}),
+    ("Improve Satisfaction (→5)", {'SatisfactionScore': 5}),
+    ("Increase Cashback (→₹300)", {'CashbackAmount': 300}),
+    ("Increase Orders (→5)", {'OrderCount': 5}),
+    ("Recent Order (→5 days)", {'DaySinceLastOrder': 5}),
+    ("More App Usage (→4hrs)", {'HourSpendOnApp': 4, 'CouponUsed': 5}),
+]
+
+# Filled in once every scenario has been scored below
+current_section = st.container()
 
 st.divider()
 
@@ -134,11 +119,33 @@ with col4:
     new_tenure = st.slider("Projected Tenure", 0, 61, tenure,
         help="What if customer stays longer?")
 
-# Calculate new probability
-new_prob = model.predict_proba(
-    make_prediction(new_tenure, new_sat, new_complain, new_cash,
-                   new_coupon, new_orders, new_days, new_hours,
-                   devices, number_of_address))[0][1]
+# Score the current profile, the simulated profile and every single intervention in one call
+scenarios = [
+    ("Current", {}),
+    ("After Intervention", {
+        'Tenure': new_tenure, 'SatisfactionScore': new_sat, 'Complain': new_complain,
+        'CashbackAmount': new_cash, 'CouponUsed': new_coupon, 'OrderCount': new_orders,
+        'DaySinceLastOrder': new_days, 'HourSpendOnApp': new_hours
+    }),
+] + INTERVENTIONS
+probs = predict_many([{**customer, **changes} for _, changes in scenarios])
+current_prob, new_prob = float(probs[0]), float(probs[1])
+
+with current_section:
+    st.divider()
+    st.subheader("📊 Current Churn Probability")
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Current Churn Risk", f"{current_prob*100:.1f}%")
+    col2.metric("Health Score", f"{int((1-current_prob)*100)}/100")
+    if current_prob >= 0.6:
+        col3.metric("Risk Level", "🔴 HIGH RISK")
+        st.error(f"🚨 This customer has {current_prob*100:.1f}% chance of churning — immediate action needed!")
+    elif current_prob >= 0.3:
+        col3.metric("Risk Level", "🟡 MEDIUM RISK")
+        st.warning(f"⚠️ This customer has {current_prob*100:.1f}% chance of churning — schedule outreach")
+    else:
+        col3.metric("Risk Level", "🟢 LOW RISK")
+        st.success(f"✅ This customer has {current_prob*100:.1f}% chance of churning — keep engaging")
 
 reduction = current_prob - new_prob
 revenue_impact = reduction * annual_revenue
@@ -193,20 +200,10 @@ st.divider()
 st.subheader("💡 Individual Intervention Impact")
 st.markdown("*See which single action has the biggest impact:*")
 
-interventions = {
-    "Resolve Complaint": make_prediction(tenure, satisfaction, 0, cashback, coupon, order_count, day_since, hour_spend, devices, number_of_address),
-    "Improve Satisfaction (→5)": make_prediction(tenure, 5, complain, cashback, coupon, order_count, day_since, hour_spend, devices, number_of_address),
-    "Increase Cashback (→₹300)": make_prediction(tenure, satisfaction, complain, 300, coupon, order_count, day_since, hour_spend, devices, number_of_address),
-    "Increase Orders (→5)": make_prediction(tenure, satisfaction, complain, cashback, coupon, 5, day_since, hour_spend, devices, number_of_address),
-    "Recent Order (→5 days)": make_prediction(tenure, satisfaction, complain, cashback, coupon, order_count, 5, hour_spend, devices, number_of_address),
-    "More App Usage (→4hrs)": make_prediction(tenure, satisfaction, complain, cashback, 5, order_count, day_since, 4, devices, number_of_address),
-}
-
 impact_data = []
-for action, df in interventions.items():
-    new_p = model.predict_proba(df)[0][1]
+for (action, _), new_p in zip(INTERVENTIONS, probs[2:]):
     impact = (current_prob - new_p) * 100
-    impact_data.append({'Action': action, 'Churn Reduction': round(impact, 1)})
+    impact_data.append({'Action': action, 'Churn Reduction': round(float(impact), 1)})
 
 impact_df = pd.DataFrame(impact_data).sort_values('Churn Reduction', ascending=False)
 
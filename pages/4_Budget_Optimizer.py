@@ -1,6 +1,10 @@
+import hashlib
+import os
 import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
+from src.batch import RESULTS_FILE
+from src.budget import OFFERS, MarginalReturns, load_population
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -10,103 +14,214 @@ st.title("💰 Retention Budget Optimizer")
 st.markdown("*How do I allocate my retention budget for maximum ROI?*")
 st.divider()
 
-col1, col2 = st.columns(2)
-with col1:
-    total_budget = st.number_input("Total Retention Budget (₹)", 10000, 10000000, 600000, 10000)
-with col2:
-    high_risk_count = st.number_input("High Risk Customers", 1, 10000, 937)
-    medium_risk_count = st.number_input("Medium Risk Customers", 1, 10000, 14)
-
-avg_rev = st.slider("Average Customer Revenue (₹/year)", 1000, 50000, 5000, 1000)
-
-if st.button("🧮 Optimize Budget", type="primary"):
-    with st.spinner("Optimizing budget allocation..."):
-        high_cost, medium_cost, low_cost = 500, 300, 100
-        high_ret, medium_ret, low_ret = 0.30, 0.25, 0.15
-
-        high_spend = min(total_budget, high_risk_count * high_cost)
-        remaining = total_budget - high_spend
-        medium_spend = min(remaining, medium_risk_count * medium_cost)
-        remaining -= medium_spend
-        low_customers = max(0, int(remaining / low_cost))
-        low_spend = low_customers * low_cost
-
-        high_customers_funded = int(high_spend / high_cost)
-        medium_customers_funded = int(medium_spend / medium_cost) if medium_spend > 0 else 0
-        low_customers_funded = int(low_spend / low_cost) if low_spend > 0 else 0
-
-        high_saved = int(high_customers_funded * high_ret) * avg_rev
-        medium_saved = int(medium_customers_funded * medium_ret) * avg_rev
-        low_saved = int(low_customers_funded * low_ret) * avg_rev
-        total_saved = high_saved + medium_saved + low_saved
-        total_spent = high_spend + medium_spend + low_spend
-        roi = ((total_saved - total_spent) / total_spent) * 100
-
-        col1, col2, col3, col4 = st.columns(4)
-        col1.metric("Total Budget", f"₹{total_budget:,}")
-        col2.metric("Total Spent", f"₹{total_spent:,}")
-        col3.metric("Revenue Saved", f"₹{total_saved:,}")
-        col4.metric("Overall ROI", f"{roi:.0f}%")
-        st.divider()
-
-        df = pd.DataFrame({
-            'Segment': ['🔴 High Risk', '🟡 Medium Risk', '🟢 Low Risk'],
-            'Customers': [high_risk_count, medium_risk_count, low_customers],
-            'Cost/Customer': [f'₹{high_cost}', f'₹{medium_cost}', f'₹{low_cost}'],
-            'Total Spend': [f'₹{high_spend:,}', f'₹{medium_spend:,}', f'₹{low_spend:,}'],
-            'Retained': [
-                int(high_customers_funded * high_ret),
-                int(medium_customers_funded * medium_ret),
-                int(low_customers_funded * low_ret)
-            ],
-            'Revenue Saved': [f'₹{high_saved:,}', f'₹{medium_saved:,}', f'₹{low_saved:,}']
-        })
-        st.table(df.set_index('Segment'))
-        st.divider()
-
-        fig = go.Figure(data=[
-            go.Bar(name='Total Spend',
-                   x=['🔴 High Risk', '🟡 Medium Risk', '🟢 Low Risk'],
-                   y=[high_spend, medium_spend, low_spend],
-                   marker_color=['#ff4444', '#ffaa00', '#44bb44']),
-            go.Bar(name='Revenue Saved',
-                   x=['🔴 High Risk', '🟡 Medium Risk', '🟢 Low Risk'],
-                   y=[high_saved, medium_saved, low_saved],
-                   marker_color=['#ff9999', '#ffdd99', '#99dd99'])
-        ])
-        fig.update_layout(
-            title="Budget Spend vs Revenue Saved by Segment",
-            barmode='group',
-            height=400,
-            yaxis_title="Amount (₹)"
-        )
-        st.plotly_chart(fig, use_container_width=True)
-        st.divider()
+# ============================================
+# SCORED POPULATION
+# ============================================
+# Sorting every customer's marginal returns is the only expensive step — do it
+# once per population, then every budget is a lookup into the running totals
+@st.cache_resource(max_entries=4, show_spinner=False)
+def load_returns(key, _source):
+    population = load_population(_source)
+    return population, MarginalReturns(population['churn_prob'], population['AnnualRevenue'])
 
-        if roi > 100:
-            st.success(f"✅ Every ₹1 spent returns ₹{total_saved/total_spent:.1f} — Strong business case!")
-        elif roi > 0:
-            st.warning("⚠️ Positive ROI — consider allocating more to High Risk segment")
-        else:
-            st.error("❌ Budget too low — focus on High Risk customers only")
+st.subheader("📂 Scored Customers")
+batch_results = None
+if 'batch_dir' in st.session_state:
+    path = os.path.join(st.session_state['batch_dir'], RESULTS_FILE)
+    if os.path.exists(path):
+        batch_results = path
 
+sources = (["Latest Batch Analysis results"] if batch_results else []) + ["Upload scored file"]
+source_choice = st.radio("Population", sources, horizontal=True)
+
+source, key = None, None
+if source_choice == "Latest Batch Analysis results":
+    stat = os.stat(batch_results)
+    source, key = batch_results, f"{batch_results}:{stat.st_mtime_ns}:{stat.st_size}"
 else:
-    st.info("👆 Enter budget details and click **Optimize Budget**")
+    uploaded_files = st.file_uploader(
+        f"Upload {RESULTS_FILE} from Batch Analysis, or every part file of a `python -m src.score` run "
+        "(CSV, CSV.GZ, CSV.ZST or Parquet)",
+        type=['csv', 'gz', 'zst', 'parquet'],
+        accept_multiple_files=True
+    )
+    if uploaded_files:
+        # Part files concatenate in name order, as when loading the output directory
+        source = sorted(uploaded_files, key=lambda f: f.name)
+        digest = hashlib.sha256()
+        for f in source:
+            digest.update(f.name.encode())
+            digest.update(hashlib.sha256(f.getvalue()).digest())
+        key = digest.hexdigest()
+
+if source is None:
+    st.info("👆 Score customers in **Batch Analysis** (or with `python -m src.score`) and load the results here")
     st.markdown("""
 **How it works:**
-- Allocates budget starting from **highest ROI segment first**
-- High Risk → ₹500/customer
-- Medium Risk → ₹300/customer
-- Low Risk → ₹100/customer
+- Each customer can receive one retention offer:
+""" + "\n".join(f"  - {name} → ₹{cost}/customer, retains {rate:.0%} of would-be churners"
+                for name, cost, rate in OFFERS) + """
+- Expected value of an offer = churn probability × annual revenue × retention rate
+- Budget goes to the customer upgrades with the **highest revenue saved per ₹** first
+- Offers that return less than ₹1 per ₹1 spent are never funded
     """)
+else:
+    try:
+        with st.spinner("Ranking every customer's marginal return..."):
+            population, returns = load_returns(key, source)
+    except Exception as e:
+        st.error(f"Could not read scored file: {e}")
+        st.stop()
+
+    col1, col2 = st.columns(2)
+    col1.metric("Customers", f"{len(population):,}")
+    col2.metric("Revenue at Risk", f"₹{(population['churn_prob'] * population['AnnualRevenue']).sum():,.0f}")
+
+    total_budget = st.number_input("Total Retention Budget (₹)", 10000, 1000000000, 600000, 10000)
+
+    # ============================================
+    # ALLOCATION
+    # ============================================
+    allocation = returns.allocate(total_budget)
+    total_spent, total_saved, roi = allocation.spent, allocation.saved, allocation.roi
+
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Total Budget", f"₹{total_budget:,}")
+    col2.metric("Total Spent", f"₹{total_spent:,.0f}")
+    col3.metric("Revenue Saved", f"₹{total_saved:,.0f}")
+    col4.metric("Overall ROI", f"{roi:.0f}%")
+    if total_spent < total_budget - max(cost for _, cost, _ in OFFERS):
+        st.caption(f"₹{total_budget - total_spent:,.0f} left unspent — every remaining offer would return less than it costs")
+    st.divider()
 
+    by_offer = allocation.by_offer(population)
+    df = pd.DataFrame({
+        'Offer': by_offer['Offer'],
+        'Customers': by_offer['Customers'],
+        'Cost/Customer': [f'₹{c:,.0f}' for c in by_offer['Cost/Customer']],
+        'Total Spend': [f'₹{v:,.0f}' for v in by_offer['Total Spend']],
+        'Expected Retained': by_offer['Expected Retained'].round(0).astype(int),
+        'Revenue Saved': [f'₹{v:,.0f}' for v in by_offer['Revenue Saved']]
+    })
+    st.table(df.set_index('Offer'))
+    st.divider()
+
+    fig = go.Figure(data=[
+        go.Bar(name='Total Spend',
+               x=by_offer['Offer'],
+               y=by_offer['Total Spend'],
+               marker_color=['#44bb44', '#ffaa00', '#ff4444']),
+        go.Bar(name='Revenue Saved',
+               x=by_offer['Offer'],
+               y=by_offer['Revenue Saved'],
+               marker_color=['#99dd99', '#ffdd99', '#ff9999'])
+    ])
+    fig.update_layout(
+        title="Budget Spend vs Revenue Saved by Offer",
+        barmode='group',
+        height=400,
+        yaxis_title="Amount (₹)"
+    )
+    st.plotly_chart(fig, use_container_width=True)
+    st.divider()
+
+    if total_spent == 0:
+        st.error("❌ No offer pays for itself in this population at these costs")
+    elif roi > 100:
+        st.success(f"✅ Every ₹1 spent returns ₹{total_saved/total_spent:.1f} — Strong business case!")
+    elif roi > 0:
+        st.warning("⚠️ Positive ROI — but the last rupees funded are close to break-even")
+    else:
+        st.error("❌ Budget too low — focus on High Risk customers only")
+
+    st.divider()
+
+    # ============================================
+    # ROI VS BUDGET FRONTIER
     # ============================================
+    st.subheader("📈 Revenue Saved & ROI vs Budget")
+    frontier = returns.frontier()
+    landmarks = returns.landmarks()
+
+    fig_frontier = go.Figure()
+    fig_frontier.add_trace(go.Scatter(
+        x=frontier['Budget'], y=frontier['Revenue Saved'],
+        name='Revenue Saved', mode='lines', line=dict(color='#44bb44', width=3)
+    ))
+    fig_frontier.add_trace(go.Scatter(
+        x=frontier['Budget'], y=frontier['ROI %'],
+        name='ROI %', mode='lines', line=dict(color='#4444ff', width=2, dash='dot'), yaxis='y2'
+    ))
+    fig_frontier.add_vline(x=total_budget, line_color='gray', annotation_text="Your budget")
+    if landmarks['diminishing_returns']:
+        fig_frontier.add_vline(x=landmarks['diminishing_returns'], line_dash='dash', line_color='#ffaa00',
+                               annotation_text="Diminishing returns", annotation_position='top left')
+    if landmarks['break_even']:
+        fig_frontier.add_vline(x=landmarks['break_even'], line_dash='dash', line_color='#ff4444',
+                               annotation_text="Break-even", annotation_position='bottom right')
+    fig_frontier.update_layout(
+        xaxis_title="Budget (₹)",
+        yaxis=dict(title='Revenue Saved (₹)'),
+        yaxis2=dict(title='ROI %', overlaying='y', side='right'),
+        height=420,
+        legend=dict(x=0.7, y=1.15)
+    )
+    st.plotly_chart(fig_frontier, use_container_width=True)
+
+    col1, col2 = st.columns(2)
+    if landmarks['diminishing_returns'] is not None:
+        col1.warning(f"🟡 **Diminishing returns at ₹{landmarks['diminishing_returns']:,.0f}** — "
+                     "beyond this, each extra ₹1 saves less than ₹1")
+    if landmarks['break_even'] == 0:
+        col2.error("🔴 **No offer pays for itself** — every ₹1 spent saves less than ₹1")
+    elif landmarks['break_even'] is not None:
+        col2.error(f"🔴 **Break-even at ₹{landmarks['break_even']:,.0f}** — "
+                   "spending more than this loses money overall")
+    else:
+        col2.success("🟢 Even funding every offer for every customer stays profitable")
+
+    st.markdown("**What-if budgets** — each answer is a lookup on the curve above:")
+    what_if = st.text_input("Budgets to compare (₹, comma-separated)", "200000, 500000, 1000000")
+    try:
+        budgets = [float(b) for b in what_if.replace('₹', '').split(',') if b.strip()]
+    except ValueError:
+        st.error("Enter budgets as numbers separated by commas")
+        budgets = []
+    if budgets:
+        spent, saved = returns.at_budgets(budgets)
+        st.table(pd.DataFrame({
+            'Budget': [f'₹{b:,.0f}' for b in budgets],
+            'Spent': [f'₹{v:,.0f}' for v in spent],
+            'Revenue Saved': [f'₹{v:,.0f}' for v in saved],
+            'ROI': [f'{(v - c) / c * 100:.0f}%' if c else '—' for v, c in zip(saved, spent)]
+        }).set_index('Budget'))
+    st.divider()
+
+    # Only the previewed rows are built on each rerun; the full plan CSV is
+    # built once, when asked for, and kept for this population and budget
+    st.subheader(f"📋 Funded Customers ({allocation.funded:,})")
+    st.dataframe(allocation.plan(population, limit=1000), use_container_width=True)
+    plan_key = (key, total_budget)
+    if st.session_state.get('retention_plan', (None,))[0] != plan_key:
+        if st.button("Prepare Plan"):
+            with st.spinner("Building the retention plan..."):
+                st.session_state['retention_plan'] = (plan_key, allocation.plan(population).to_csv(index=False))
+    prepared = st.session_state.get('retention_plan')
+    if prepared is not None and prepared[0] == plan_key:
+        st.download_button(
+            label="Download Retention Plan",
+            data=prepared[1],
+            file_name="retention_plan.csv",
+            mime="text/csv"
+        )
+
+# ============================================
 # FOOTER
 # ============================================
 st.divider()
 st.markdown("""
 <div style='text-align: center; color: gray; padding: 10px;'>
-    Built by <b>Amruth</b> | Python • XGBoost • SHAP • Streamlit | 
+    Built by <b>Amruth</b> | Python • XGBoost • SHAP • Streamlit |
     <a href='https://github.com/Amruth011/customer-churn-prediction-retention-roi' target='_blank'>GitHub</a>
 </div>
-""", unsafe_allow_html=True)
\ No newline at end of file
+""", unsafe_allow_html=True)
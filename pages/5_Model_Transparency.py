@@ -1,11 +1,11 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import joblib
 import plotly.graph_objects as go
-import plotly.express as px
-from sklearn.metrics import (confusion_matrix, classification_report,
-                             roc_auc_score, roc_curve, accuracy_score)
+from src.crossval import load_results
+from src.data import dataset_version
+from src.evaluation import load_evaluation
+from src.modeling import CANDIDATES, DEPLOYED_MODEL
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -16,45 +16,33 @@ st.markdown("*Real metrics computed from actual model + test data — nothing ha
 st.divider()
 
 # ============================================
-# LOAD MODEL & TEST DATA
+# LOAD EVALUATION
 # ============================================
-@st.cache_resource
-def load_model():
+# Metrics are computed once per (model, test data) pair and stored under
+# data/processed/evaluations/ — reruns only read the artifact back
+def load_metrics():
     try:
-        return joblib.load('src/best_churn_model.pkl')
+        return load_evaluation()
     except Exception as e:
-        st.error(f"Model loading failed: {e}")
-        return None
-
-@st.cache_data
-def load_test_data():
-    try:
-        df = pd.read_csv('data/raw/test_data.csv')
-        return df
-    except Exception as e:
-        st.error(f"Test data loading failed: {e}")
+        st.error(f"Model evaluation failed: {e}")
         return None
 
 with st.spinner("Loading model and test data..."):
-    model = load_model()
-    test_df = load_test_data()
+    evaluation = load_metrics()
 
-if model is None or test_df is None:
+if evaluation is None:
     st.stop()
 
-# Prepare test data
-X_test = test_df.drop('Churn', axis=1)
-y_test = test_df['Churn']
+accuracy = evaluation['accuracy']
+auc = evaluation['auc']
+cm = evaluation['confusion_matrix']
+tn, fp, fn, tp = cm['tn'], cm['fp'], cm['fn'], cm['tp']
+n_test = evaluation['samples']
+n_churn = evaluation['positives']
 
-# Predictions
-y_pred = model.predict(X_test)
-y_prob = model.predict_proba(X_test)[:, 1]
-
-# Metrics
-accuracy = accuracy_score(y_test, y_pred)
-auc = roc_auc_score(y_test, y_prob)
-cm = confusion_matrix(y_test, y_pred)
-tn, fp, fn, tp = cm.ravel()
+# Written offline by `python -m src.crossval` — None until that job has run
+cv_results = load_results()
+CV_MISSING = "Cross-validation results not found — run `python -m src.crossval` to generate them."
 
 st.success("✅ All metrics computed from real model + test data!")
 st.divider()
@@ -67,8 +55,8 @@ col1, col2, col3, col4, col5 = st.columns(5)
 col1.metric("Model", "XGBoost")
 col2.metric("AUC Score", f"{auc:.4f}")
 col3.metric("Accuracy", f"{accuracy*100:.2f}%")
-col4.metric("Test Samples", f"{len(y_test):,}")
-col5.metric("Churn Cases", f"{y_test.sum():,}")
+col4.metric("Test Samples", f"{n_test:,}")
+col5.metric("Churn Cases", f"{n_churn:,}")
 
 st.divider()
 
@@ -76,29 +64,40 @@ st.divider()
 # MODEL COMPARISON
 # ============================================
 st.subheader("🤖 Model Comparison")
-model_df = pd.DataFrame({
-    'Model': ['Logistic Regression', 'Gradient Boosting', 'Random Forest', 'XGBoost ⭐'],
-    'AUC Score': [0.8687, 0.9428, 0.9988, round(auc, 4)],
-    'Accuracy': [87.03, 91.03, 98.31, round(accuracy*100, 2)]
-})
-
-fig1 = go.Figure(data=[
-    go.Bar(
-        x=model_df['Model'],
-        y=model_df['AUC Score'],
-        marker_color=['#aaaaaa', '#aaaaaa', '#aaaaaa', '#ff4444'],
-        text=[f"{v:.4f}" for v in model_df['AUC Score']],
-        textposition='auto'
+
+if cv_results is None:
+    st.info(CV_MISSING)
+else:
+    n_folds = cv_results['n_splits']
+    compared = [m for m in CANDIDATES if m in cv_results['models']]
+    model_df = pd.DataFrame({
+        'Model': [f"{m} ⭐" if m == DEPLOYED_MODEL else m for m in compared],
+        'AUC Score': [round(cv_results['models'][m]['mean_auc'], 4) for m in compared],
+        'AUC Std': [round(cv_results['models'][m]['std_auc'], 4) for m in compared],
+        'Accuracy': [round(cv_results['models'][m]['mean_accuracy'] * 100, 2) for m in compared]
+    })
+    best = compared[int(np.argmax(model_df['AUC Score']))]
+
+    fig1 = go.Figure(data=[
+        go.Bar(
+            x=model_df['Model'],
+            y=model_df['AUC Score'],
+            error_y=dict(type='data', array=model_df['AUC Std']),
+            marker_color=['#ff4444' if m == DEPLOYED_MODEL else '#aaaaaa' for m in compared],
+            text=[f"{v:.4f}" for v in model_df['AUC Score']],
+            textposition='auto'
+        )
+    ])
+    fig1.update_layout(
+        title=f"Mean {n_folds}-Fold CV AUC — {best} Leads",
+        yaxis_title="AUC Score",
+        yaxis=dict(range=[0.8, 1.0]),
+        height=400
     )
-])
-fig1.update_layout(
-    title="AUC Score Comparison — XGBoost Wins!",
-    yaxis_title="AUC Score",
-    yaxis=dict(range=[0.8, 1.0]),
-    height=400
-)
-st.plotly_chart(fig1, use_container_width=True)
-st.table(model_df.set_index('Model'))
+    st.plotly_chart(fig1, use_container_width=True)
+    st.table(model_df.set_index('Model'))
+    st.caption(f"Stratified {n_folds}-fold cross-validation over all {cv_results['rows']:,} customers "
+               f"({cv_results['created']}). ⭐ = deployed model.")
 st.divider()
 
 # ============================================
@@ -130,7 +129,7 @@ with col2:
     st.metric("✅ True Positives", f"{tp:,}", help="Correctly caught churners")
     st.metric("⚠️ False Positives", f"{fp:,}", help="Wrong alarm — predicted churn but didn't")
     st.metric("❌ False Negatives", f"{fn:,}", help="Missed churners — predicted stay but left")
-    revenue_at_risk = fn * 5000
+    revenue_at_risk = evaluation['revenue_at_risk']
     st.warning(f"💰 {fn} missed churners = ₹{revenue_at_risk:,} revenue at risk")
 
 st.divider()
@@ -141,7 +140,7 @@ st.divider()
 st.subheader("📋 Detailed Classification Report")
 st.markdown("*Precision, Recall and F1 Score — the complete picture:*")
 
-report = classification_report(y_test, y_pred, output_dict=True)
+report = evaluation['classification_report']
 report_df = pd.DataFrame(report).transpose().round(3)
 report_df = report_df.drop(['macro avg', 'weighted avg'], errors='ignore')
 report_df.index = ['Not Churned', 'Churned', 'Accuracy']
@@ -159,11 +158,11 @@ col4.metric("AUC Score", f"{auc:.4f}",
 st.divider()
 
 # Class imbalance note
-total = len(y_test)
-churn_pct = (y_test.sum() / total * 100)
+total = n_test
+churn_pct = (n_churn / total * 100)
 st.info(
-    f"📊 Class Distribution in Test Set: {total - int(y_test.sum())} Not Churned "
-    f"({round(100 - churn_pct, 1)}%) vs {int(y_test.sum())} Churned "
+    f"📊 Class Distribution in Test Set: {total - n_churn} Not Churned "
+    f"({round(100 - churn_pct, 1)}%) vs {n_churn} Churned "
     f"({round(churn_pct, 1)}%) — "
     f"Model handles this imbalance well with {round(report['1']['recall'] * 100, 1)}% recall on minority class"
 )
@@ -173,7 +172,7 @@ st.divider()
 # ============================================
 st.subheader("📈 ROC Curve — Real AUC")
 
-fpr, tpr, _ = roc_curve(y_test, y_prob)
+fpr, tpr = evaluation['roc_curve']['fpr'], evaluation['roc_curve']['tpr']
 
 fig_roc = go.Figure()
 fig_roc.add_trace(go.Scatter(
@@ -204,24 +203,22 @@ st.divider()
 st.subheader("🔍 Feature Importance — From XGBoost Model")
 st.markdown("*Real feature importance scores extracted directly from trained model:*")
 
-feature_importance = model.feature_importances_
-feature_names = X_test.columns.tolist()
-
 fi_df = pd.DataFrame({
-    'Feature': feature_names,
-    'Importance': feature_importance
+    'Feature': list(evaluation['feature_importance']),
+    'Importance': list(evaluation['feature_importance'].values())
 }).sort_values('Importance', ascending=False).head(15)
 
-fig_fi = px.bar(
-    fi_df,
-    x='Importance',
-    y='Feature',
+fig_fi = go.Figure(go.Bar(
+    x=fi_df['Importance'],
+    y=fi_df['Feature'],
     orientation='h',
-    color='Importance',
-    color_continuous_scale='Reds',
-    title='Top 15 Feature Importance (From XGBoost)'
-)
+    marker=dict(color=fi_df['Importance'], colorscale='Reds', showscale=True,
+                colorbar=dict(title='Importance'))
+))
 fig_fi.update_layout(
+    title='Top 15 Feature Importance (From XGBoost)',
+    xaxis_title='Importance',
+    yaxis_title='Feature',
     height=500,
     yaxis={'categoryorder': 'total ascending'}
 )
@@ -234,41 +231,49 @@ st.divider()
 st.subheader("✅ Cross Validation Results")
 st.markdown("*Proves model is stable — not just lucky on one test:*")
 
-cv_scores = [0.9930, 0.9826, 0.9897, 0.9875, 0.9828]
-st.caption("Note: Cross-validation scores recorded during model training phase")
-cv_df = pd.DataFrame({
-    'Fold': ['Fold 1', 'Fold 2', 'Fold 3', 'Fold 4', 'Fold 5'],
-    'AUC Score': cv_scores
-})
-
-fig_cv = go.Figure(data=[
-    go.Scatter(
-        x=cv_df['Fold'],
-        y=cv_df['AUC Score'],
-        mode='lines+markers+text',
-        text=[f"{v:.4f}" for v in cv_df['AUC Score']],
-        textposition='top center',
-        line=dict(color='#ff4444', width=3),
-        marker=dict(size=10)
+if cv_results is None or DEPLOYED_MODEL not in cv_results['models']:
+    st.info(CV_MISSING)
+else:
+    cv_scores = cv_results['models'][DEPLOYED_MODEL]['fold_auc']
+    if cv_results['dataset_sha256'] != dataset_version():
+        st.warning("⚠️ The dataset changed since these scores were computed — rerun `python -m src.crossval`.")
+    st.caption(f"{DEPLOYED_MODEL} scores from stratified {len(cv_scores)}-fold cross-validation "
+               f"({cv_results['wall_seconds']:.0f}s across {cv_results['workers']} worker cores)")
+
+    cv_df = pd.DataFrame({
+        'Fold': [f'Fold {i}' for i in range(1, len(cv_scores) + 1)],
+        'AUC Score': cv_scores
+    })
+
+    fig_cv = go.Figure(data=[
+        go.Scatter(
+            x=cv_df['Fold'],
+            y=cv_df['AUC Score'],
+            mode='lines+markers+text',
+            text=[f"{v:.4f}" for v in cv_df['AUC Score']],
+            textposition='top center',
+            line=dict(color='#ff4444', width=3),
+            marker=dict(size=10)
+        )
+    ])
+    fig_cv.add_hline(
+        y=np.mean(cv_scores),
+        line_dash="dash",
+        line_color="green",
+        annotation_text=f"Mean AUC: {np.mean(cv_scores):.4f}"
     )
-])
-fig_cv.add_hline(
-    y=np.mean(cv_scores),
-    line_dash="dash",
-    line_color="green",
-    annotation_text=f"Mean AUC: {np.mean(cv_scores):.4f}"
-)
-fig_cv.update_layout(
-    title="Cross Validation AUC Scores",
-    yaxis=dict(range=[0.97, 1.0]),
-    height=350
-)
-st.plotly_chart(fig_cv, use_container_width=True)
+    fig_cv.update_layout(
+        title="Cross Validation AUC Scores",
+        yaxis=dict(range=[min(0.97, min(cv_scores) - 0.005), 1.0]),
+        height=350
+    )
+    st.plotly_chart(fig_cv, use_container_width=True)
 
-col1, col2, col3 = st.columns(3)
-col1.metric("Mean AUC", f"{np.mean(cv_scores):.4f}")
-col2.metric("Std Deviation", f"{np.std(cv_scores):.4f}")
-col3.metric("Stability", "✅ Excellent")
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Mean AUC", f"{np.mean(cv_scores):.4f}")
+    col2.metric("Std Deviation", f"{np.std(cv_scores):.4f}")
+    # Same bar the notebook used: under 0.02 std across folds is stable
+    col3.metric("Stability", "✅ Excellent" if np.std(cv_scores) < 0.02 else "⚠️ High variance")
 
 st.divider()
 
@@ -286,7 +291,7 @@ st.markdown(f"""
 | #2 Churn Driver | **{second_feature}** — second most important |
 | Model Accuracy | **{accuracy*100:.2f}%** on unseen test data |
 | AUC Score | **{auc:.4f}** — near perfect discrimination |
-| Missed Churners | **{fn}** customers — ₹{fn*5000:,} revenue at risk |
+| Missed Churners | **{fn}** customers — ₹{evaluation['revenue_at_risk']:,} revenue at risk |
 | Best Retention Action | Resolve complaints immediately |
 """)
 
@@ -1,7 +1,6 @@
 import streamlit as st
-import pandas as pd
 import plotly.graph_objects as go
-import plotly.express as px
+from src.cohort import load_cube
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -12,43 +11,30 @@ st.markdown("*When do customers churn? Which tenure group is most at risk?*")
 st.divider()
 
 # ============================================
-# LOAD DATA
+# LOAD COHORT CUBE
 # ============================================
-@st.cache_data
+# Every chart below is a marginal of the persisted cube — no customer rows are scanned.
+# Loading it is a stat plus a tiny .npz read, so it is not cached in-session and a
+# changed workbook is picked up on the next rerun.
 def load_data():
     try:
-        df = pd.read_excel('data/raw/E Commerce Dataset.xlsx', sheet_name='E Comm')
-        return df
+        return load_cube()
     except Exception as e:
         st.error(f"Data loading failed: {e}")
         return None
 
 with st.spinner("Loading dataset..."):
-    df = load_data()
+    cube = load_data()
 
-if df is None:
+if cube is None:
     st.stop()
 
-# ============================================
-# FEATURE ENGINEERING
-# ============================================
-df['Churn'] = df['Churn'].astype(int)
-
-df['TenureGroup'] = pd.cut(
-    df['Tenure'],
-    bins=[-1, 3, 6, 12, 24, 100],
-    labels=['0-3 months', '3-6 months', '6-12 months', '12-24 months', '24+ months']
-)
-
 # ============================================
 # KEY METRICS
 # ============================================
 st.subheader("📊 Churn Rate by Tenure Group")
 
-cohort = df.groupby('TenureGroup').agg(
-    Total=('Churn', 'count'),
-    Churned=('Churn', 'sum')
-).reset_index()
+cohort = cube.tenure_cohort()
 cohort['Churn Rate %'] = (cohort['Churned'] / cohort['Total'] * 100).round(2)
 cohort['Retained'] = cohort['Total'] - cohort['Churned']
 
@@ -84,20 +70,28 @@ st.divider()
 # ============================================
 st.subheader("😤 Complaint Impact by Tenure Group")
 
-complaint_cohort = df.groupby(['TenureGroup', 'Complain'])['Churn'].mean().reset_index()
+complaint_cohort = cube.complaint_by_tenure()
 complaint_cohort['Churn Rate %'] = (complaint_cohort['Churn'] * 100).round(2)
 complaint_cohort['Complained'] = complaint_cohort['Complain'].map({0: 'No Complaint', 1: 'Complained'})
 
-fig2 = px.bar(
-    complaint_cohort,
-    x='TenureGroup',
-    y='Churn Rate %',
-    color='Complained',
+fig2 = go.Figure([
+    go.Bar(
+        x=group['TenureGroup'].astype(str),
+        y=group['Churn Rate %'],
+        name=status,
+        marker_color=color
+    )
+    for status, color in [('No Complaint', '#44bb44'), ('Complained', '#ff4444')]
+    for group in [complaint_cohort[complaint_cohort['Complained'] == status]]
+])
+fig2.update_layout(
+    title="Churn Rate by Tenure Group & Complaint Status",
+    xaxis_title='TenureGroup',
+    yaxis_title='Churn Rate %',
+    legend_title='Complained',
     barmode='group',
-    color_discrete_map={'No Complaint': '#44bb44', 'Complained': '#ff4444'},
-    title="Churn Rate by Tenure Group & Complaint Status"
+    height=400
 )
-fig2.update_layout(height=400)
 st.plotly_chart(fig2, use_container_width=True)
 st.info("💡 Complained customers churn significantly more across ALL tenure groups!")
 
@@ -108,10 +102,7 @@ st.divider()
 # ============================================
 st.subheader("😊 Satisfaction Score by Tenure Group")
 
-sat_cohort = df.groupby('TenureGroup').agg(
-    Avg_Satisfaction=('SatisfactionScore', 'mean'),
-    Churn_Rate=('Churn', 'mean')
-).reset_index()
+sat_cohort = cube.satisfaction_by_tenure()
 sat_cohort['Avg_Satisfaction'] = sat_cohort['Avg_Satisfaction'].round(2)
 sat_cohort['Churn_Rate %'] = (sat_cohort['Churn_Rate'] * 100).round(2)
 
@@ -148,22 +139,28 @@ st.divider()
 # ============================================
 st.subheader("💰 Cashback Amount by Tenure Group")
 
-cash_cohort = df.groupby(['TenureGroup', 'Churn']).agg(
-    Avg_Cashback=('CashbackAmount', 'mean')
-).reset_index()
+cash_cohort = cube.cashback_by_tenure()
 cash_cohort['Status'] = cash_cohort['Churn'].map({0: 'Retained', 1: 'Churned'})
 cash_cohort['Avg_Cashback'] = cash_cohort['Avg_Cashback'].round(2)
 
-fig4 = px.bar(
-    cash_cohort,
-    x='TenureGroup',
-    y='Avg_Cashback',
-    color='Status',
+fig4 = go.Figure([
+    go.Bar(
+        x=group['TenureGroup'].astype(str),
+        y=group['Avg_Cashback'],
+        name=status,
+        marker_color=color
+    )
+    for status, color in [('Retained', '#44bb44'), ('Churned', '#ff4444')]
+    for group in [cash_cohort[cash_cohort['Status'] == status]]
+])
+fig4.update_layout(
+    title="Average Cashback — Churned vs Retained by Tenure Group",
+    xaxis_title='TenureGroup',
+    yaxis_title='Avg_Cashback',
+    legend_title='Status',
     barmode='group',
-    color_discrete_map={'Retained': '#44bb44', 'Churned': '#ff4444'},
-    title="Average Cashback — Churned vs Retained by Tenure Group"
+    height=400
 )
-fig4.update_layout(height=400)
 st.plotly_chart(fig4, use_container_width=True)
 st.info("💡 Retained customers consistently receive higher cashback across all tenure groups!")
 
@@ -174,10 +171,7 @@ st.divider()
 # ============================================
 st.subheader("🏙️ Churn Rate by City Tier")
 
-city_cohort = df.groupby('CityTier').agg(
-    Total=('Churn', 'count'),
-    Churned=('Churn', 'sum')
-).reset_index()
+city_cohort = cube.city_tier()
 city_cohort['Churn Rate %'] = (city_cohort['Churned'] / city_cohort['Total'] * 100).round(2)
 
 fig5 = go.Figure(data=[
@@ -211,7 +205,7 @@ lowest_churn = cohort.loc[cohort['Churn Rate %'].idxmin()]
 col1, col2, col3 = st.columns(3)
 col1.error(f"🔴 Highest Risk Group\n\n**{highest_churn['TenureGroup']}**\n\n{highest_churn['Churn Rate %']:.1f}% churn rate")
 col2.success(f"🟢 Lowest Risk Group\n\n**{lowest_churn['TenureGroup']}**\n\n{lowest_churn['Churn Rate %']:.1f}% churn rate")
-col3.info("📊 Overall Churn Rate\n\n**16.84%**\n\nAcross all 5,630 customers")
+col3.info(f"📊 Overall Churn Rate\n\n**{city_cohort['Churned'].sum() / cube.total * 100:.2f}%**\n\nAcross all {cube.total:,} customers")
 
 st.divider()
 st.markdown("""
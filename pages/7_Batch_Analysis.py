@@ -1,23 +1,31 @@
+import io
+import os
+import time
 import streamlit as st
 import pandas as pd
-import joblib
 import plotly.graph_objects as go
-import plotly.express as px
+from src.batch import (HIGH_RISK_FILE, HISTOGRAM_BINS, RESULTS_FILE, RISK_LEVELS, cache_key,
+                       count_rows, load_scored)
+from src.cache import stream_digest
+from src.export import EXPORT_FORMATS, available_formats, export_file
+from src.inference import MODEL_PATH
+from src.jobs import ACTIVE, runner
 import warnings
 warnings.filterwarnings('ignore')
 
 st.set_page_config(page_title="Batch Analysis", page_icon="📊", layout="wide")
 
-@st.cache_resource
-def load_model():
-    try:
-        return joblib.load('src/best_churn_model.pkl')
-    except Exception as e:
-        st.error(f"Model loading failed: {e}")
-        return None
+# How often the page re-checks a running job
+POLL_SECONDS = 1.0
 
-model = load_model()
-if model is None:
+# Job records are shared by every session on the server: this session only
+# ever lists or opens the jobs it submitted (job ID -> its upload's file name)
+my_jobs = st.session_state.setdefault('batch_jobs', {})
+
+# The model itself is only loaded by the job that scores an upload — opening
+# the page, or reopening cached results, never imports xgboost
+if not MODEL_PATH.exists():
+    st.error(f"Model loading failed: {MODEL_PATH.name} not found")
     st.stop()
 
 st.title("📊 Batch Customer Analysis")
@@ -47,156 +55,37 @@ uploaded_file = st.file_uploader(
     help="CSV must have same columns as sample template"
 )
 
-def engineer_features(data):
-    data = data.copy()
-    data['engagement_score'] = data['HourSpendOnApp'] * data['OrderCount']
-    data['order_frequency'] = data['OrderCount'] / (data['DaySinceLastOrder'] + 1)
-    data['cashback_per_order'] = data['CashbackAmount'] / (data['OrderCount'] + 1)
-    data['is_new_customer'] = (data['Tenure'] < 3).astype(int)
-    data['high_risk'] = ((data['Complain'] == 1) & (data['SatisfactionScore'] <= 2)).astype(int)
-    data['device_loyalty'] = data['NumberOfDeviceRegistered']
-    return data
-
+scored = None
 if uploaded_file is not None:
-    df = pd.read_csv(uploaded_file)
-    st.success(f"File uploaded successfully — {len(df)} customers found!")
+    # Counted and hashed once per upload, not on every rerun — keyed on the
+    # upload itself, since a corrected file can have the same name and size
+    upload_id = uploaded_file.file_id
+    if st.session_state.get('upload_info', (None,))[0] != upload_id:
+        st.session_state['upload_info'] = (upload_id, count_rows(uploaded_file), stream_digest(uploaded_file))
+    _, total_rows, upload_digest = st.session_state['upload_info']
+    results_key = cache_key(upload_digest)
+    st.success(f"File uploaded successfully — {total_rows} customers found!")
 
     st.subheader("Data Preview")
-    st.dataframe(df.head(10), use_container_width=True)
+    st.dataframe(pd.read_csv(uploaded_file, nrows=10), use_container_width=True)
+    uploaded_file.seek(0)
     st.divider()
 
-    if st.button("Predict Churn for All Customers", type="primary"):
-        required_cols = [
-            'Tenure', 'PreferredLoginDevice', 'CityTier', 'WarehouseToHome',
-            'PreferredPaymentMode', 'Gender', 'HourSpendOnApp',
-            'NumberOfDeviceRegistered', 'PreferedOrderCat', 'SatisfactionScore',
-            'MaritalStatus', 'NumberOfAddress', 'Complain',
-            'OrderAmountHikeFromlastYear', 'CouponUsed', 'OrderCount',
-            'DaySinceLastOrder', 'CashbackAmount'
-        ]
-        missing_cols = [c for c in required_cols if c not in df.columns]
-        if missing_cols:
-            st.error(f"Missing required columns: {', '.join(missing_cols)}")
-            st.stop()
-
-        with st.spinner(f"Predicting churn for {len(df)} customers..."):
-
-            if 'AnnualRevenue' in df.columns:
-                annual_revenue = df['AnnualRevenue'].copy()
-            else:
-                annual_revenue = pd.Series([5000] * len(df))
-
-            df_features = engineer_features(df)
-
-            if 'AnnualRevenue' in df_features.columns:
-                df_features = df_features.drop('AnnualRevenue', axis=1)
-
-            churn_probs = model.predict_proba(df_features)[:, 1]
-            churn_pred = model.predict(df_features)
-
-            results = df.copy()
-            results.insert(0, 'Customer_ID', range(1, len(df) + 1))
-            results['Churn_Probability'] = (churn_probs * 100).round(1)
-            results['Churn_Predicted'] = churn_pred
-            results['AnnualRevenue'] = annual_revenue
-            results['Priority_Score'] = (annual_revenue * churn_probs).round(0)
-            results['Health_Score'] = ((1 - churn_probs) * 100).round(0).astype(int)
-
-            risk_labels = []
-            for p in churn_probs:
-                if p >= 0.6:
-                    risk_labels.append('HIGH RISK')
-                elif p >= 0.3:
-                    risk_labels.append('MEDIUM RISK')
-                else:
-                    risk_labels.append('LOW RISK')
-            results['Risk_Level'] = risk_labels
-
-            action_map = {
-                'HIGH RISK': 'Call Today — Personal Outreach',
-                'MEDIUM RISK': 'Call This Week — Loyalty Offer',
-                'LOW RISK': 'Email Campaign — Regular Engagement'
-            }
-            results['Recommended_Action'] = results['Risk_Level'].map(action_map)
-
-        st.divider()
-        st.subheader("Prediction Summary")
-
-        high_risk_count = int((churn_probs >= 0.6).sum())
-        medium_risk_count = int(((churn_probs >= 0.3) & (churn_probs < 0.6)).sum())
-        low_risk_count = int((churn_probs < 0.3).sum())
-        revenue_at_risk = float(annual_revenue[churn_probs >= 0.6].sum())
-        avg_prob = float(churn_probs.mean() * 100)
-
-        col1, col2, col3, col4, col5 = st.columns(5)
-        col1.metric("Total Customers", len(df))
-        col2.metric("High Risk", high_risk_count)
-        col3.metric("Medium Risk", medium_risk_count)
-        col4.metric("Low Risk", low_risk_count)
-        col5.metric("Avg Churn Risk", f"{round(avg_prob, 1)}%")
-
-        st.metric("Total Revenue at Risk", f"Rs.{round(revenue_at_risk, 0)}")
-
-        st.divider()
-
-        col1, col2 = st.columns(2)
-        with col1:
-            st.subheader("Risk Distribution")
-            fig_pie = go.Figure(data=[go.Pie(
-                labels=['High Risk', 'Medium Risk', 'Low Risk'],
-                values=[high_risk_count, medium_risk_count, low_risk_count],
-                hole=0.4,
-                marker_colors=['#ff4444', '#ffaa00', '#44bb44']
-            )])
-            fig_pie.update_layout(height=350)
-            st.plotly_chart(fig_pie, use_container_width=True)
-
-        with col2:
-            st.subheader("Churn Probability Distribution")
-            fig_hist = px.histogram(
-                x=churn_probs * 100,
-                nbins=20,
-                color_discrete_sequence=['#ff4444'],
-                labels={'x': 'Churn Probability (%)'}
-            )
-            fig_hist.update_layout(height=350)
-            st.plotly_chart(fig_hist, use_container_width=True)
-
-        st.divider()
-        st.subheader("Customer Priority List")
-        st.markdown("*Sorted by Priority Score — who to contact first:*")
-
-        display_cols = [
-            'Churn_Probability', 'Risk_Level', 'Health_Score',
-            'Priority_Score', 'AnnualRevenue', 'Recommended_Action'
-        ]
-        priority_df = results[display_cols].sort_values(
-            'Priority_Score', ascending=False
-        ).reset_index(drop=True)
-        priority_df.index += 1
-        st.dataframe(priority_df, use_container_width=True)
-
-        st.divider()
-        st.subheader("Download Results")
-
-        csv_output = results.to_csv(index=False)
-        st.download_button(
-            label="Download Full Predictions as CSV",
-            data=csv_output,
-            file_name="churn_predictions.csv",
-            mime="text/csv"
-        )
-
-        high_risk_df = results[results['Risk_Level'] == 'HIGH RISK']
-        if len(high_risk_df) > 0:
-            csv_high = high_risk_df.to_csv(index=False)
-            st.download_button(
-                label="Download HIGH RISK Customers Only",
-                data=csv_high,
-                file_name="high_risk_customers.csv",
-                mime="text/csv"
-            )
-            st.warning(f"{len(high_risk_df)} HIGH RISK customers need immediate attention!")
+    # Results are streamed into a disk cache shared by all sessions: the same bytes
+    # scored by the same model — by anyone, before any restart — load instantly
+    scored = load_scored(results_key)
+    running = [job for job in runner.list(my_jobs) if job['key'] == results_key and job['status'] in ACTIVE]
+    if scored is not None:
+        st.caption("⚡ These exact customers were already scored by the current model — results loaded from cache")
+    elif running:
+        st.session_state['batch_job'] = running[0]['id']
+    elif st.button("Predict Churn for All Customers", type="primary"):
+        # Scored on a background worker: this page only polls the job, so it stays
+        # responsive while the job list below shows its progress
+        job_id = runner.submit(io.BytesIO(uploaded_file.getvalue()), results_key, total_rows, uploaded_file.name)
+        my_jobs[job_id] = uploaded_file.name
+        st.session_state['batch_job'] = job_id
+        st.session_state['priority_page'] = 1
 
 else:
     st.info("Upload a CSV file to get started!")
@@ -224,6 +113,137 @@ else:
     })
     st.table(required_cols.set_index('Column'))
 
+# This session's jobs stay listed after the upload is cleared, so a finished
+# job's results can be reopened without uploading the file again
+jobs = runner.list(my_jobs) if scored is None else []
+if jobs:
+    st.divider()
+    st.subheader("Scoring Jobs")
+    job_ids = [job['id'] for job in jobs]
+    labels = {job['id']: f"{my_jobs[job['id']] or job['id']} — {job['status']} "
+                         f"({time.strftime('%d %b %H:%M', time.localtime(job['created']))})" for job in jobs}
+    if st.session_state.get('batch_job') not in job_ids:
+        st.session_state['batch_job'] = job_ids[0]
+    job_id = st.selectbox("Job", job_ids, format_func=labels.get, key='batch_job')
+    job = runner.get(job_id)
+
+    if job['status'] in ACTIVE:
+        fraction = min(job['rows_done'] / max(job['total_rows'], 1), 1.0)
+        text = (f"Scored {job['rows_done']:,} of {job['total_rows']:,} customers" if job['status'] == 'running'
+                else "Waiting for a free worker...")
+        st.progress(fraction, text=text)
+        if st.button("Cancel Job") and not runner.cancel(job_id) and runner.get(job_id)['status'] in ACTIVE:
+            # Another session scoring the same file keeps the job running — stop following it here
+            my_jobs.pop(job_id, None)
+        time.sleep(POLL_SECONDS)
+        st.rerun()
+    elif job['status'] == 'done':
+        scored = runner.result(job_id)
+        if scored is None:
+            st.warning("These results have since been evicted from the cache — upload the file again to rescore it")
+    elif job['status'] == 'failed':
+        st.error(job['error'])
+    elif job['status'] == 'cancelled':
+        st.info(f"Job cancelled after {job['rows_done']:,} of {job['total_rows']:,} customers")
+    else:
+        st.warning("This job was interrupted by a server restart — upload the file again to rescore it")
+
+if scored is not None:
+    batch_dir, summary = scored
+    # Read by the Budget Optimizer
+    st.session_state['batch_dir'] = str(batch_dir)
+    results_path = os.path.join(batch_dir, RESULTS_FILE)
+    high_risk_path = os.path.join(batch_dir, HIGH_RISK_FILE)
+    st.divider()
+    st.subheader("Prediction Summary")
+
+    col1, col2, col3, col4, col5 = st.columns(5)
+    col1.metric("Total Customers", summary.total)
+    col2.metric("High Risk", summary.high_risk_count)
+    col3.metric("Medium Risk", summary.medium_risk_count)
+    col4.metric("Low Risk", summary.low_risk_count)
+    col5.metric("Avg Churn Risk", f"{round(summary.avg_prob, 1)}%")
+
+    st.metric("Total Revenue at Risk", f"Rs.{round(summary.revenue_at_risk, 0)}")
+
+    st.divider()
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.subheader("Risk Distribution")
+        fig_pie = go.Figure(data=[go.Pie(
+            labels=['High Risk', 'Medium Risk', 'Low Risk'],
+            values=[summary.high_risk_count, summary.medium_risk_count, summary.low_risk_count],
+            hole=0.4,
+            marker_colors=['#ff4444', '#ffaa00', '#44bb44']
+        )])
+        fig_pie.update_layout(height=350)
+        st.plotly_chart(fig_pie, use_container_width=True)
+
+    with col2:
+        st.subheader("Churn Probability Distribution")
+        fig_hist = go.Figure(go.Bar(
+            x=(HISTOGRAM_BINS[:-1] + HISTOGRAM_BINS[1:]) / 2,
+            y=summary.histogram,
+            width=HISTOGRAM_BINS[1] - HISTOGRAM_BINS[0],
+            marker_color='#ff4444'
+        ))
+        fig_hist.update_layout(height=350, xaxis_title='Churn Probability (%)', yaxis_title='count')
+        st.plotly_chart(fig_hist, use_container_width=True)
+
+    st.divider()
+    st.subheader("Customer Priority List")
+    st.markdown("*Sorted by Priority Score — who to contact first:*")
+
+    # Only the kept top customers per risk level live in memory, and only one
+    # page of them is sent to the browser — however large the upload was
+    col1, col2 = st.columns([3, 1])
+    levels = col1.multiselect("Risk level", RISK_LEVELS, default=RISK_LEVELS)
+    page_size = col2.selectbox("Rows per page", [25, 50, 100], index=1)
+    ranked_count = min(summary.level_count(levels), summary.top_n)
+    n_pages = max(-(-ranked_count // page_size), 1)
+    # Narrowing the filter can leave the remembered page past the end
+    st.session_state['priority_page'] = min(st.session_state.get('priority_page', 1), n_pages)
+    page = st.number_input(f"Page (of {n_pages})", min_value=1, max_value=n_pages, key='priority_page')
+    priority_df = summary.priority_page(page - 1, page_size, levels)
+    if len(priority_df):
+        st.caption(f"Ranks {priority_df.index[0]:,}–{priority_df.index[-1]:,} of the top {ranked_count:,} "
+                   f"({summary.level_count(levels):,} matching customers) — download the full file below")
+    st.dataframe(priority_df, use_container_width=True)
+
+    st.divider()
+    st.subheader("Download Results")
+
+    # Exports are encoded block by block from the scored file on disk, but
+    # st.download_button holds whatever it serves in memory — so the file is
+    # read only on the run where "Prepare Download" is clicked, never on the
+    # reruns in between
+    col1, col2 = st.columns(2)
+    export_rows = col1.radio("Customers", ["All customers", "HIGH RISK only"],
+                             disabled=summary.high_risk_count == 0)
+    export_fmt = col2.selectbox("Format", available_formats(),
+                                format_func=lambda f: EXPORT_FORMATS[f][0])
+    source_path = high_risk_path if export_rows == "HIGH RISK only" else results_path
+
+    if st.button("Prepare Download"):
+        try:
+            with st.spinner(f"Writing {EXPORT_FORMATS[export_fmt][0]}..."):
+                export_path = str(export_file(source_path, export_fmt))
+        except Exception as e:
+            st.error(f"Could not write the {EXPORT_FORMATS[export_fmt][0]} export: {e}")
+        else:
+            with open(export_path, 'rb') as f:
+                st.download_button(
+                    label=f"Download {export_rows} as {EXPORT_FORMATS[export_fmt][0]}",
+                    data=f,
+                    file_name=os.path.basename(export_path),
+                    mime=EXPORT_FORMATS[export_fmt][1]
+                )
+
+    if summary.high_risk_count > 0:
+        st.warning(f"{summary.high_risk_count} HIGH RISK customers need immediate attention!")
+
+
 st.divider()
 st.markdown(
     "<div style='text-align: center; color: gray; padding: 10px;'>"
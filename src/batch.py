@@ -0,0 +1,277 @@
+"""Batch scoring for uploaded customer files.
+
+`score_frame` turns raw customer rows into the Batch Analysis result columns.
+`stream_score` applies it chunk by chunk to a CSV of any size, writing results
+as it goes and keeping only running aggregates in memory. `score_upload`
+wraps it in an on-disk cache keyed by the upload's bytes and the model
+version, so the same file is only ever scored once per model.
+"""
+import pickle
+from pathlib import Path
+from typing import Callable, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.cache import DiskCache, stream_digest
+from src.data import PROCESSED_DIR
+from src.features import missing_features
+from src.inference import DECISION_THRESHOLD, model_version, predict_batch
+
+HIGH_RISK_THRESHOLD = 0.6
+MEDIUM_RISK_THRESHOLD = 0.3
+
+# Used when the upload has no AnnualRevenue column
+DEFAULT_ANNUAL_REVENUE = 5000
+
+ACTION_MAP = {
+    'HIGH RISK': 'Call Today — Personal Outreach',
+    'MEDIUM RISK': 'Call This Week — Loyalty Offer',
+    'LOW RISK': 'Email Campaign — Regular Engagement'
+}
+
+DISPLAY_COLS = [
+    'Churn_Probability', 'Risk_Level', 'Health_Score',
+    'Priority_Score', 'AnnualRevenue', 'Recommended_Action'
+]
+
+# Columns kept for the priority list (Customer_ID so a ranked row can be acted on)
+PRIORITY_COLS = ['Customer_ID'] + DISPLAY_COLS
+
+RISK_LEVELS = ['HIGH RISK', 'MEDIUM RISK', 'LOW RISK']
+
+CHUNK_SIZE = 100_000
+
+# Rows kept per risk level for the on-screen priority list
+PRIORITY_LIST_SIZE = 1000
+
+# Churn probability histogram: 20 bins of 5 percentage points
+HISTOGRAM_BINS = np.linspace(0, 100, 21)
+
+# Scored uploads kept on disk, shared by every session and surviving restarts
+RESULTS_CACHE_DIR = PROCESSED_DIR / 'batch_results'
+RESULTS_CACHE_BYTES = 2 << 30
+
+RESULTS_FILE = 'churn_predictions.csv'
+HIGH_RISK_FILE = 'high_risk_customers.csv'
+SUMMARY_FILE = 'summary.pkl'
+
+results_cache = DiskCache(RESULTS_CACHE_DIR, RESULTS_CACHE_BYTES)
+
+
+def risk_level(churn_probs: np.ndarray) -> np.ndarray:
+    """HIGH / MEDIUM / LOW RISK label for each probability."""
+    return np.select(
+        [churn_probs >= HIGH_RISK_THRESHOLD, churn_probs >= MEDIUM_RISK_THRESHOLD],
+        ['HIGH RISK', 'MEDIUM RISK'],
+        default='LOW RISK'
+    )
+
+
+def top_k(frame: pd.DataFrame, k: int, column: str = 'Priority_Score') -> pd.DataFrame:
+    """The `k` rows with the largest `column`, sorted descending.
+
+    Uses a linear-time partial selection, so only the kept rows are ever sorted.
+    NaN ranks below every number (argpartition alone would rank it highest),
+    so rows with an unknown score only fill places no scored row can.
+    """
+    if len(frame) > k:
+        values = np.nan_to_num(frame[column].to_numpy(dtype=np.float64), nan=-np.inf)
+        frame = frame.iloc[np.argpartition(values, len(values) - k)[len(values) - k:]]
+    return frame.sort_values(column, ascending=False, kind='stable')
+
+
+def score_frame(df: pd.DataFrame, first_id: int = 1):
+    """Score raw customer rows and add the result columns to `df` in place.
+
+    Returns `(df, churn_probs)`. Customer_IDs are numbered from `first_id` so
+    consecutive chunks of one file get consecutive IDs.
+    """
+    if 'AnnualRevenue' in df.columns:
+        annual_revenue = df['AnnualRevenue'].to_numpy()
+    else:
+        annual_revenue = np.full(len(df), DEFAULT_ANNUAL_REVENUE)
+
+    churn_probs = predict_batch(df)
+
+    df.insert(0, 'Customer_ID', np.arange(first_id, first_id + len(df)))
+    df['Churn_Probability'] = (churn_probs * 100).round(1)
+    df['Churn_Predicted'] = (churn_probs >= DECISION_THRESHOLD).astype(int)
+    df['AnnualRevenue'] = annual_revenue
+    df['Priority_Score'] = (annual_revenue * churn_probs).round(0)
+    df['Health_Score'] = ((1 - churn_probs) * 100).round(0).astype(int)
+    df['Risk_Level'] = risk_level(churn_probs)
+    df['Recommended_Action'] = df['Risk_Level'].map(ACTION_MAP)
+    return df, churn_probs
+
+
+class BatchSummary:
+    """Running aggregates over scored chunks — constant memory however many rows are scored."""
+
+    def __init__(self, top_n: int = PRIORITY_LIST_SIZE):
+        self.top_n = top_n
+        self.total = 0
+        self.high_risk_count = 0
+        self.medium_risk_count = 0
+        self.low_risk_count = 0
+        self.revenue_at_risk = 0.0
+        self.prob_sum = 0.0
+        self.histogram = np.zeros(len(HISTOGRAM_BINS) - 1, dtype=np.int64)
+        # Best `top_n` customers of each risk level, so the list can be filtered without a rescan
+        self.top_by_risk = {level: pd.DataFrame(columns=PRIORITY_COLS) for level in RISK_LEVELS}
+
+    def _keep_top(self, level: str, rows: pd.DataFrame) -> None:
+        kept = self.top_by_risk[level]
+        if not kept.empty:
+            rows = pd.concat([kept, rows])
+        self.top_by_risk[level] = top_k(rows, self.top_n)
+
+    def update(self, results: pd.DataFrame, churn_probs: np.ndarray) -> None:
+        """Fold one scored chunk into the aggregates."""
+        high = churn_probs >= HIGH_RISK_THRESHOLD
+        medium = (churn_probs >= MEDIUM_RISK_THRESHOLD) & ~high
+        self.total += len(churn_probs)
+        self.high_risk_count += int(high.sum())
+        self.medium_risk_count += int(medium.sum())
+        self.low_risk_count += int((~high & ~medium).sum())
+        self.revenue_at_risk += float(results['AnnualRevenue'].to_numpy()[high].sum())
+        self.prob_sum += float(churn_probs.sum())
+        self.histogram += np.histogram(churn_probs * 100, bins=HISTOGRAM_BINS)[0]
+        for level, mask in zip(RISK_LEVELS, (high, medium, ~high & ~medium)):
+            if mask.any():
+                self._keep_top(level, top_k(results.loc[mask, PRIORITY_COLS], self.top_n))
+
+    def merge(self, other: 'BatchSummary') -> None:
+        """Fold another summary (e.g. from a worker process) into this one."""
+        self.total += other.total
+        self.high_risk_count += other.high_risk_count
+        self.medium_risk_count += other.medium_risk_count
+        self.low_risk_count += other.low_risk_count
+        self.revenue_at_risk += other.revenue_at_risk
+        self.prob_sum += other.prob_sum
+        self.histogram += other.histogram
+        for level, rows in other.top_by_risk.items():
+            if not rows.empty:
+                self._keep_top(level, rows)
+
+    def level_count(self, levels=RISK_LEVELS) -> int:
+        """Customers scored at any of `levels`."""
+        counts = {'HIGH RISK': self.high_risk_count, 'MEDIUM RISK': self.medium_risk_count,
+                  'LOW RISK': self.low_risk_count}
+        return sum(counts[level] for level in levels)
+
+    def priorities(self, levels=RISK_LEVELS) -> pd.DataFrame:
+        """Top `top_n` customers by Priority_Score among `levels`, highest first."""
+        frames = [self.top_by_risk[level] for level in levels if not self.top_by_risk[level].empty]
+        if not frames:
+            return pd.DataFrame(columns=PRIORITY_COLS)
+        return top_k(pd.concat(frames), self.top_n)
+
+    @property
+    def top_priorities(self) -> pd.DataFrame:
+        return self.priorities()
+
+    def priority_page(self, page: int, page_size: int, levels=RISK_LEVELS) -> pd.DataFrame:
+        """One page (0-based) of the filtered priority list, indexed by rank."""
+        ranked = self.priorities(levels).reset_index(drop=True)
+        ranked.index += 1
+        return ranked.iloc[page * page_size:(page + 1) * page_size]
+
+    def as_dict(self) -> dict:
+        """Headline metrics as plain numbers, e.g. for a JSON report."""
+        return {
+            'total_customers': self.total,
+            'high_risk': self.high_risk_count,
+            'medium_risk': self.medium_risk_count,
+            'low_risk': self.low_risk_count,
+            'revenue_at_risk': round(self.revenue_at_risk, 2),
+            'avg_churn_probability_pct': round(self.avg_prob, 2)
+        }
+
+    @property
+    def avg_prob(self) -> float:
+        """Mean churn probability in percent."""
+        return self.prob_sum / self.total * 100 if self.total else 0.0
+
+
+def stream_score(source, output, high_risk_output=None, chunksize: int = CHUNK_SIZE,
+                 progress: Optional[Callable[[int], None]] = None) -> BatchSummary:
+    """Read `source` CSV in chunks, score each one and append the results to `output`.
+
+    HIGH RISK rows are also written to `high_risk_output` when given. `progress`
+    is called with the number of rows scored so far after every chunk. Raises
+    ValueError if the file is missing any raw feature column.
+    """
+    summary = BatchSummary()
+    for i, chunk in enumerate(pd.read_csv(source, chunksize=chunksize)):
+        if i == 0:
+            missing = missing_features(chunk.columns)
+            if missing:
+                raise ValueError(f"Missing required columns: {', '.join(missing)}")
+        results, churn_probs = score_frame(chunk, first_id=summary.total + 1)
+        results.to_csv(output, index=False, header=(i == 0))
+        if high_risk_output is not None:
+            results[results['Risk_Level'] == 'HIGH RISK'].to_csv(
+                high_risk_output, index=False, header=(i == 0))
+        summary.update(results, churn_probs)
+        if progress is not None:
+            progress(summary.total)
+    return summary
+
+
+def count_rows(source, chunk_size: int = 1 << 20) -> int:
+    """Number of data rows in a CSV file object (lines minus the header), then rewind it."""
+    lines = 0
+    last = b'\n'
+    for block in iter(lambda: source.read(chunk_size), b''):
+        lines += block.count(b'\n')
+        last = block[-1:]
+    source.seek(0)
+    if last != b'\n':
+        lines += 1
+    return max(lines - 1, 0)
+
+
+def cache_key(upload_digest: str) -> str:
+    """Results cache key: the upload's SHA-256 plus the version of the model scoring it."""
+    return f"{upload_digest[:32]}-{model_version()}"
+
+
+def upload_key(source) -> str:
+    """`cache_key` of a binary file object (rewound afterwards)."""
+    return cache_key(stream_digest(source))
+
+
+def load_scored(key: str):
+    """(entry folder, BatchSummary) for an already scored upload, or None."""
+    path = results_cache.get(key)
+    if path is None:
+        return None
+    try:
+        with open(path / SUMMARY_FILE, 'rb') as f:
+            return path, pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None
+
+
+def score_upload(source, key: Optional[str] = None,
+                 progress: Optional[Callable[[int], None]] = None):
+    """Score a CSV upload into the results cache, reusing a previous run of the same bytes.
+
+    Returns `(entry folder, summary)`; the folder holds RESULTS_FILE and
+    HIGH_RISK_FILE. Raises ValueError like `stream_score`.
+    """
+    key = key or upload_key(source)
+    scored = load_scored(key)
+    if scored is not None:
+        return scored
+
+    def build(folder: Path) -> BatchSummary:
+        with open(folder / RESULTS_FILE, 'w', newline='') as out, \
+                open(folder / HIGH_RISK_FILE, 'w', newline='') as high_out:
+            summary = stream_score(source, out, high_out, progress=progress)
+        with open(folder / SUMMARY_FILE, 'wb') as f:
+            pickle.dump(summary, f)
+        return summary
+
+    return results_cache.put(key, build)
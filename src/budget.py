@@ -0,0 +1,289 @@
+"""Per-customer retention budget allocation over a scored population.
+
+Each customer can get at most one retention offer. An offer costs a fixed
+amount and retains the customer with some probability, so its expected value
+is churn probability × annual revenue × retention rate. This is a
+multiple-choice knapsack, solved with the marginal-ROI greedy:
+
+1. The offer menu is reduced to its concave "upgrade ladder" (offers that
+   are never the best use of the extra spend are dropped), identical for
+   every customer because value scales linearly with p × revenue.
+2. Each rung of the ladder is one upgrade step per customer, with a marginal
+   return of expected revenue saved per rupee. All steps are sorted by that
+   return once, and running totals of cost and revenue are kept.
+3. Any budget is then answered by a binary search over the cumulative cost —
+   funding the steps with the best return first.
+
+Sorting is the only O(n log n) work and runs once per population; a million
+customers take a few hundred milliseconds. The same running totals give the
+whole revenue-saved / ROI versus budget curve (`frontier`) without
+re-allocating per point, and any list of budgets is a vectorized lookup
+(`at_budgets`).
+"""
+from pathlib import Path
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.batch import DEFAULT_ANNUAL_REVENUE
+
+# (name, cost per customer in ₹, probability the offer retains a would-be churner)
+OFFERS = [
+    ('Email Campaign', 100, 0.15),
+    ('Loyalty Offer', 300, 0.25),
+    ('Personal Outreach', 500, 0.30)
+]
+
+# Don't fund a step that returns less than ₹1 of expected revenue per ₹1 spent
+MIN_MARGINAL_RETURN = 1.0
+
+# Points on the plotted ROI-vs-budget curve
+FRONTIER_POINTS = 400
+
+POPULATION_COLUMNS = ['Customer_ID', 'Churn_Probability', 'AnnualRevenue']
+
+
+# Compression of each CSV format `src.score` writes — given explicitly, since
+# pandas can only infer it from a path, not from an uploaded file object
+CSV_COMPRESSION = {'csv': None, 'csv.gz': 'gzip', 'csv.zst': 'zstd'}
+
+
+def scored_format(name) -> str:
+    """'parquet', 'csv.gz', 'csv.zst' or 'csv', from a scored file's name."""
+    name = str(name).lower()
+    return next((fmt for fmt in ('parquet', 'csv.gz', 'csv.zst') if name.endswith('.' + fmt)), 'csv')
+
+
+def _read_scored(source, fmt: str) -> pd.DataFrame:
+    if fmt == 'parquet':
+        df = pd.read_parquet(source)
+        return df[[c for c in POPULATION_COLUMNS if c in df.columns]]
+    return pd.read_csv(source, usecols=lambda c: c in POPULATION_COLUMNS, compression=CSV_COMPRESSION[fmt])
+
+
+def load_population(source, fmt: Optional[str] = None) -> pd.DataFrame:
+    """Customer_ID, churn probability (0-1) and AnnualRevenue from scored output.
+
+    `source` is a Batch Analysis / `src.score` results file (path or file
+    object), a list of them — e.g. the part files of one `src.score` run,
+    concatenated in order — or a `src.score` output directory. The format of
+    each file comes from its name unless `fmt` is given for a single file.
+    """
+    if isinstance(source, (str, Path)) and Path(source).is_dir():
+        parts = sorted(Path(source).glob('part-*.*'))
+        if not parts:
+            raise ValueError(f"No scored part files in {source}")
+        source = parts
+    if isinstance(source, (list, tuple)):
+        if not source:
+            raise ValueError("No scored files given")
+        df = pd.concat([_read_scored(part, scored_format(getattr(part, 'name', part))) for part in source],
+                       ignore_index=True)
+    else:
+        df = _read_scored(source, fmt or scored_format(getattr(source, 'name', source)))
+    if 'Churn_Probability' not in df.columns:
+        raise ValueError("Scored file has no Churn_Probability column — score it in Batch Analysis first")
+    population = pd.DataFrame({
+        'Customer_ID': df['Customer_ID'].to_numpy() if 'Customer_ID' in df.columns else np.arange(1, len(df) + 1),
+        # Scored files store the probability as a percentage
+        'churn_prob': df['Churn_Probability'].to_numpy(dtype=np.float64) / 100,
+        'AnnualRevenue': (df['AnnualRevenue'].to_numpy(dtype=np.float64) if 'AnnualRevenue' in df.columns
+                          else np.full(len(df), float(DEFAULT_ANNUAL_REVENUE)))
+    })
+    return population
+
+
+def offer_ladder(offers: Sequence = OFFERS):
+    """Upgrade steps along the concave hull of (cost, retention rate), starting from no offer.
+
+    Returns (offer index reached by each step, step cost, step retention gain).
+    """
+    points = sorted((cost, rate, i) for i, (_, cost, rate) in enumerate(offers))
+    hull = [(0.0, 0.0, -1)]
+    for cost, rate, i in points:
+        if rate <= hull[-1][1]:
+            continue  # costs more and retains no better — dominated
+        # Drop earlier rungs whose marginal return is beaten by going straight to this offer
+        while len(hull) >= 2:
+            (c0, r0, _), (c1, r1, _) = hull[-2], hull[-1]
+            if (r1 - r0) * (cost - c0) <= (rate - r0) * (c1 - c0):
+                hull.pop()
+            else:
+                break
+        hull.append((cost, rate, i))
+    tiers = np.array([i for _, _, i in hull[1:]], dtype=np.int8)
+    step_cost = np.diff([c for c, _, _ in hull]).astype(np.float64)
+    step_gain = np.diff([r for _, r, _ in hull]).astype(np.float64)
+    return tiers, step_cost, step_gain
+
+
+class MarginalReturns:
+    """Every customer's upgrade steps sorted by marginal return, with running totals.
+
+    Built once per population; `allocate` answers any budget from it.
+    """
+
+    def __init__(self, churn_prob: np.ndarray, annual_revenue: np.ndarray, offers: Sequence = OFFERS):
+        self.offers = list(offers)
+        self.n_customers = len(churn_prob)
+        self.tiers, step_cost, step_gain = offer_ladder(self.offers)
+        n_steps = len(step_cost)
+
+        value = np.asarray(churn_prob, dtype=np.float64) * np.asarray(annual_revenue, dtype=np.float64)
+        by_value = np.argsort(-value)
+        # Each ladder rung is already sorted once customers are in value order, and the
+        # rungs' returns fall step by step — so a stable sort only has to merge sorted runs
+        ratio_runs = np.concatenate([value[by_value] * (g / c) for c, g in zip(step_cost, step_gain)])
+        order = np.argsort(-ratio_runs, kind='stable')
+
+        run, pos = np.divmod(order, self.n_customers)
+        self.customer = by_value[pos].astype(np.int64)
+        self.step = run.astype(np.int8)
+        self.ratio = ratio_runs[order]
+        # Ascending copy for binary searches on the return threshold
+        self._neg_ratio = -self.ratio
+        self.cost = step_cost[self.step]
+        self.saved = value[self.customer] * step_gain[self.step]
+        self.cum_cost = np.cumsum(self.cost)
+        self.cum_saved = np.cumsum(self.saved)
+        self.n_steps = n_steps
+        self._frontiers = {}
+
+    def steps_within(self, budget: float, min_return: float = MIN_MARGINAL_RETURN) -> int:
+        """Number of leading steps funded by `budget`, stopping below `min_return`."""
+        affordable = int(np.searchsorted(self.cum_cost, budget, side='right'))
+        worthwhile = int(np.searchsorted(self._neg_ratio, -min_return, side='right'))
+        return min(affordable, worthwhile)
+
+    def allocate(self, budget: float, min_return: float = MIN_MARGINAL_RETURN) -> 'Allocation':
+        """Best offer per customer for `budget`."""
+        k = self.steps_within(budget, min_return)
+        # Steps of one customer are funded in ladder order, so the count is the rung reached
+        rungs = np.bincount(self.customer[:k], minlength=self.n_customers)
+        offer = np.full(self.n_customers, -1, dtype=np.int8)
+        funded = rungs > 0
+        offer[funded] = self.tiers[rungs[funded] - 1]
+        spent = float(self.cum_cost[k - 1]) if k else 0.0
+        saved = float(self.cum_saved[k - 1]) if k else 0.0
+        return Allocation(self.offers, offer, budget, spent, saved)
+
+    def at_budgets(self, budgets, min_return: float = MIN_MARGINAL_RETURN):
+        """(spent, revenue saved) for each budget, as `allocate` would fund it — no re-allocation."""
+        budgets = np.asarray(budgets, dtype=np.float64)
+        worthwhile = int(np.searchsorted(self._neg_ratio, -min_return, side='right'))
+        k = np.minimum(np.searchsorted(self.cum_cost, budgets, side='right'), worthwhile)
+        last = np.maximum(k - 1, 0)
+        funded = k > 0
+        if not len(self.cum_cost):
+            return np.zeros_like(budgets), np.zeros_like(budgets)
+        return np.where(funded, self.cum_cost[last], 0.0), np.where(funded, self.cum_saved[last], 0.0)
+
+    def landmarks(self) -> dict:
+        """Budgets where the curve turns.
+
+        `diminishing_returns`: the next rupee would return less than ₹1 — net
+        revenue (saved − spent) peaks here. `break_even`: spending on past it,
+        total revenue saved falls below total spend (overall ROI crosses 0);
+        0.0 if no offer pays for itself, None if even funding every offer
+        stays profitable.
+        """
+        if not len(self.cum_cost):
+            return {'diminishing_returns': None, 'break_even': None}
+        k = int(np.searchsorted(self._neg_ratio, -1.0, side='right'))
+        net = self.cum_saved - self.cum_cost
+        # Net revenue rises until the marginal return drops below 1, then only falls
+        below = np.flatnonzero(net[k:] < 0)
+        if not len(below):
+            break_even = None
+        else:
+            # The first funded step already loses money when no step returns ₹1 per ₹1
+            last_profitable = k + below[0] - 1
+            break_even = float(self.cum_cost[last_profitable]) if last_profitable >= 0 else 0.0
+        return {
+            'diminishing_returns': float(self.cum_cost[k - 1]) if k else 0.0,
+            'break_even': break_even
+        }
+
+    def frontier(self, points: int = FRONTIER_POINTS) -> pd.DataFrame:
+        """Revenue saved and ROI against budget, from ₹0 to funding every offer to everyone.
+
+        Read straight off the cumulative totals (every offer funded, best
+        marginal return first) and memoised, since it only depends on the population.
+        """
+        if points not in self._frontiers:
+            top = float(self.cum_cost[-1]) if len(self.cum_cost) else 0.0
+            budgets = np.linspace(0.0, top, points)
+            spent, saved = self.at_budgets(budgets, min_return=-np.inf)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                roi = np.where(spent > 0, (saved - spent) / spent * 100, np.nan)
+            self._frontiers[points] = pd.DataFrame({
+                'Budget': budgets, 'Spent': spent, 'Revenue Saved': saved, 'ROI %': roi
+            })
+        return self._frontiers[points]
+
+
+class Allocation:
+    """Offer chosen per customer (-1 = none) and the totals it adds up to."""
+
+    def __init__(self, offers, offer: np.ndarray, budget: float, spent: float, saved: float):
+        self.offers = offers
+        self.offer = offer
+        self.budget = budget
+        self.spent = spent
+        self.saved = saved
+
+    @property
+    def roi(self) -> float:
+        """Net return on the money spent, in percent."""
+        return (self.saved - self.spent) / self.spent * 100 if self.spent else 0.0
+
+    def by_offer(self, population: pd.DataFrame) -> pd.DataFrame:
+        """Customers, spend, expected retained customers and revenue saved per offer."""
+        value = population['churn_prob'].to_numpy() * population['AnnualRevenue'].to_numpy()
+        funded = self.offer >= 0
+        idx = self.offer[funded].astype(np.intp)
+        n = len(self.offers)
+        counts = np.bincount(idx, minlength=n)
+        rates = np.array([rate for _, _, rate in self.offers])
+        costs = np.array([cost for _, cost, _ in self.offers], dtype=np.float64)
+        return pd.DataFrame({
+            'Offer': [name for name, _, _ in self.offers],
+            'Cost/Customer': costs,
+            'Customers': counts,
+            'Total Spend': counts * costs,
+            'Expected Retained': np.bincount(idx, weights=population['churn_prob'].to_numpy()[funded], minlength=n) * rates,
+            'Revenue Saved': np.bincount(idx, weights=value[funded], minlength=n) * rates
+        })
+
+    @property
+    def funded(self) -> int:
+        """Number of customers given an offer."""
+        return int((self.offer >= 0).sum())
+
+    def plan(self, population: pd.DataFrame, limit: Optional[int] = None) -> pd.DataFrame:
+        """Funded customers with their offer, cost and expected revenue saved, best first.
+
+        With `limit`, only the top `limit` customers are built — cheap enough for a preview.
+        """
+        funded = np.flatnonzero(self.offer >= 0)
+        rates = np.array([rate for _, _, rate in self.offers])
+        value = population['churn_prob'].to_numpy() * population['AnnualRevenue'].to_numpy()
+        saved = value[funded] * rates[self.offer[funded].astype(np.intp)]
+        if limit is not None and limit < len(funded):
+            # Unknown revenue (NaN) ranks last, as in sort_values
+            top = np.argpartition(-np.nan_to_num(saved, nan=-np.inf), limit - 1)[:limit]
+            funded, saved = funded[top], saved[top]
+        offer = self.offer[funded].astype(np.intp)
+        names = np.array([name for name, _, _ in self.offers], dtype=object)
+        costs = np.array([cost for _, cost, _ in self.offers], dtype=np.float64)
+        rows = population.iloc[funded]
+        plan = pd.DataFrame({
+            'Customer_ID': rows['Customer_ID'].to_numpy(),
+            'Churn_Probability': (rows['churn_prob'].to_numpy() * 100).round(1),
+            'AnnualRevenue': rows['AnnualRevenue'].to_numpy(),
+            'Offer': names[offer],
+            'Cost': costs[offer],
+            'Expected_Revenue_Saved': saved.round(0)
+        })
+        return plan.sort_values('Expected_Revenue_Saved', ascending=False, ignore_index=True)
@@ -0,0 +1,191 @@
+"""Small caching helpers shared by the inference layer."""
+import hashlib
+import os
+import shutil
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Hashable, Optional
+
+
+def file_digest(path: Path, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 hex digest of a file, read in chunks."""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def stream_digest(source: BinaryIO, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 hex digest of a binary file object, which is rewound afterwards."""
+    h = hashlib.sha256()
+    for chunk in iter(lambda: source.read(chunk_size), b''):
+        h.update(chunk)
+    source.seek(0)
+    return h.hexdigest()
+
+
+_digest_memo = {}
+_digest_lock = threading.Lock()
+
+
+def cached_file_digest(path: Path) -> str:
+    """`file_digest`, re-hashed only when the file's mtime or size changes."""
+    stat = os.stat(path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    key = str(path)
+    with _digest_lock:
+        memo = _digest_memo.get(key)
+    if memo is not None and memo[0] == signature:
+        return memo[1]
+    digest = file_digest(path)
+    with _digest_lock:
+        _digest_memo[key] = (signature, digest)
+    return digest
+
+
+class PredictionCache:
+    """Thread-safe LRU cache with an optional time-to-live per entry.
+
+    Keeps hit, miss and eviction counters so callers can check it is earning its keep.
+    """
+
+    def __init__(self, maxsize: int = 10_000, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value for `key`, or None if missing or expired."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, stored_at = entry
+            if self.ttl is not None and time.monotonic() - stored_at > self.ttl:
+                del self._data[key]
+                self.evictions += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Store `value`, evicting the least recently used entry if full."""
+        with self._lock:
+            self._data[key] = (value, time.monotonic())
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop every entry (counters are kept)."""
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        """Current size and hit/miss/eviction counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class DiskCache:
+    """Size-bounded on-disk cache of entries, each a folder of files, evicted least recently used.
+
+    Entries are built in a hidden temporary folder and renamed into place, so a
+    reader never sees a half-written entry and concurrent builders of the same
+    key don't clobber each other. Safe to share between processes.
+    """
+
+    def __init__(self, root: Path, max_bytes: int):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Path]:
+        """The entry folder for `key`, marked as recently used, or None."""
+        path = self.root / key
+        try:
+            os.utime(path)
+        except OSError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return path
+
+    def put(self, key: str, build: Callable[[Path], Any]):
+        """Run `build(folder)` to fill a new entry for `key`; returns (entry path, build's result)."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.root / f".tmp-{uuid.uuid4().hex}"
+        tmp.mkdir()
+        try:
+            result = build(tmp)
+            try:
+                os.rename(tmp, self.root / key)
+            except OSError:
+                # Another process finished the same entry first — theirs is identical
+                shutil.rmtree(tmp, ignore_errors=True)
+        except BaseException:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+        self.evict(keep=key)
+        return self.root / key, result
+
+    def _entries(self):
+        entries = []
+        for path in self.root.iterdir():
+            if path.name.startswith('.') or not path.is_dir():
+                continue
+            try:
+                size = sum(f.stat().st_size for f in path.iterdir())
+                entries.append((path.stat().st_mtime, size, path))
+            except OSError:
+                continue  # evicted by someone else meanwhile
+        return entries
+
+    def evict(self, keep: Optional[str] = None) -> None:
+        """Remove least recently used entries until the cache fits in `max_bytes`."""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if path.name == keep:
+                continue
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        entries = self._entries() if self.root.exists() else []
+        return {
+            'entries': len(entries),
+            'bytes': sum(size for _, size, _ in entries),
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions
+        }
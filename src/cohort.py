@@ -0,0 +1,229 @@
+"""Aggregate cube behind the Cohort Analysis charts.
+
+One pass over the dataset fills a TenureGroup × Complain × CityTier × Churn
+cube of customer counts plus per-cell sums of the measured columns. Every
+chart is a marginal of that cube, so reruns never touch the customer rows.
+The cube is persisted next to the dataset cache together with the
+CustomerIDs it counts and a hash of each one's row. When the dataset changes
+only by new customers, `load_cube` folds just those rows in; it rebuilds from
+scratch only if a customer already counted was edited or removed.
+"""
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.data import PROCESSED_DIR, dataset_version, load_dataset
+
+CUBE_PATH = PROCESSED_DIR / 'cohort_cube.npz'
+
+TENURE_BINS = [-1, 3, 6, 12, 24, 100]
+TENURE_LABELS = ['0-3 months', '3-6 months', '6-12 months', '12-24 months', '24+ months']
+COMPLAIN_LEVELS = [0, 1]
+CITY_TIERS = [1, 2, 3]
+CHURN_LEVELS = [0, 1]
+
+# Columns averaged by the charts — add one here to make it available as a mean
+MEASURES = ['SatisfactionScore', 'CashbackAmount']
+
+# Every column that decides a customer's cell or adds to its sums
+CUBE_COLUMNS = ['Tenure', 'Complain', 'CityTier', 'Churn'] + MEASURES
+
+# Missing or out-of-range tenure gets its own bucket so city-tier totals still count it
+SHAPE = (len(TENURE_LABELS) + 1, len(COMPLAIN_LEVELS), len(CITY_TIERS), len(CHURN_LEVELS))
+TENURE_AXIS, COMPLAIN_AXIS, CITY_AXIS, CHURN_AXIS = range(4)
+
+
+def _level_codes(values: pd.Series, levels: list) -> np.ndarray:
+    codes = pd.Categorical(values, categories=levels).codes
+    if (codes < 0).any():
+        raise ValueError(f"{values.name} has values outside {levels}")
+    return codes
+
+
+def _cell_index(df: pd.DataFrame) -> np.ndarray:
+    tenure = pd.cut(df['Tenure'], bins=TENURE_BINS, labels=False).to_numpy()
+    tenure = np.where(np.isnan(tenure), len(TENURE_LABELS), tenure).astype(np.intp)
+    return np.ravel_multi_index((
+        tenure,
+        _level_codes(df['Complain'], COMPLAIN_LEVELS),
+        _level_codes(df['CityTier'], CITY_TIERS),
+        _level_codes(df['Churn'], CHURN_LEVELS)
+    ), SHAPE)
+
+
+def _row_hashes(df: pd.DataFrame) -> np.ndarray:
+    return pd.util.hash_pandas_object(df[CUBE_COLUMNS], index=False).to_numpy(dtype=np.uint64)
+
+
+def _tenure_frame(columns: dict) -> pd.DataFrame:
+    groups = pd.Categorical(TENURE_LABELS, categories=TENURE_LABELS, ordered=True)
+    return pd.DataFrame({'TenureGroup': groups, **columns})
+
+
+class CohortCube:
+    """Customer counts and measure sums over TenureGroup × Complain × CityTier × Churn."""
+
+    def __init__(self, source_version: str = ''):
+        self.source_version = source_version
+        self.count = np.zeros(SHAPE, dtype=np.int64)
+        self.sums = {m: np.zeros(SHAPE) for m in MEASURES}
+        self.nonnull = {m: np.zeros(SHAPE, dtype=np.int64) for m in MEASURES}
+        # Counted customers, sorted by ID, and a hash of each one's CUBE_COLUMNS
+        self.customer_ids = np.empty(0, dtype=np.int64)
+        self.row_hashes = np.empty(0, dtype=np.uint64)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, source_version: str = '') -> 'CohortCube':
+        """Build a cube from customer rows in a single pass."""
+        cube = cls(source_version)
+        cube.add(df)
+        return cube
+
+    def add(self, df: pd.DataFrame) -> None:
+        """Fold new customer rows into the cube; raises ValueError if one is already counted."""
+        ids = df['CustomerID'].to_numpy(dtype=np.int64)
+        if len(np.unique(ids)) != len(ids) or np.isin(ids, self.customer_ids).any():
+            raise ValueError("Some of these customers are already counted in the cube")
+        cells = _cell_index(df)
+        size = int(np.prod(SHAPE))
+        self.count += np.bincount(cells, minlength=size).reshape(SHAPE)
+        for m in MEASURES:
+            values = df[m].to_numpy(dtype=np.float64)
+            present = ~np.isnan(values)
+            self.sums[m] += np.bincount(cells[present], weights=values[present], minlength=size).reshape(SHAPE)
+            self.nonnull[m] += np.bincount(cells[present], minlength=size).reshape(SHAPE)
+        ids = np.concatenate([self.customer_ids, ids])
+        hashes = np.concatenate([self.row_hashes, _row_hashes(df)])
+        order = np.argsort(ids, kind='stable')
+        self.customer_ids, self.row_hashes = ids[order], hashes[order]
+
+    def add_new(self, df: pd.DataFrame) -> bool:
+        """Fold in the rows of `df` (the whole dataset) that aren't counted yet.
+
+        Returns False, leaving the cube untouched, if any customer already
+        counted is missing from `df` or its row changed — the cube must then
+        be rebuilt.
+        """
+        ids = df['CustomerID'].to_numpy(dtype=np.int64)
+        counted = np.isin(ids, self.customer_ids)
+        if counted.sum() != len(self.customer_ids):
+            return False
+        old = df[counted]
+        order = np.argsort(old['CustomerID'].to_numpy(dtype=np.int64), kind='stable')
+        if not np.array_equal(_row_hashes(old)[order], self.row_hashes):
+            return False
+        if not counted.all():
+            self.add(df[~counted])
+        return True
+
+    @property
+    def total(self) -> int:
+        return int(self.count.sum())
+
+    def save(self, path: Path = CUBE_PATH) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        arrays = {'count': self.count, 'customer_ids': self.customer_ids, 'row_hashes': self.row_hashes}
+        for m in MEASURES:
+            arrays[f'sum__{m}'] = self.sums[m]
+            arrays[f'nonnull__{m}'] = self.nonnull[m]
+        meta = {'source_version': self.source_version, 'shape': SHAPE, 'measures': MEASURES}
+        tmp = path.with_name(path.stem + '.tmp.npz')
+        np.savez(tmp, meta=np.array(json.dumps(meta)), **arrays)
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path: Path = CUBE_PATH) -> 'CohortCube':
+        with np.load(path, allow_pickle=False) as f:
+            meta = json.loads(str(f['meta']))
+            if tuple(meta['shape']) != SHAPE or meta['measures'] != MEASURES:
+                raise ValueError("Cube on disk was built with a different layout")
+            cube = cls(meta['source_version'])
+            cube.count = f['count']
+            cube.customer_ids = f['customer_ids']
+            cube.row_hashes = f['row_hashes']
+            for m in MEASURES:
+                cube.sums[m] = f[f'sum__{m}']
+                cube.nonnull[m] = f[f'nonnull__{m}']
+        return cube
+
+    # ---- Chart queries: marginals over the cube -------------------------
+
+    def _keep(self, array: np.ndarray, *axes: int) -> np.ndarray:
+        return array.sum(axis=tuple(a for a in range(4) if a not in axes))
+
+    def tenure_cohort(self) -> pd.DataFrame:
+        """Total and churned customers per tenure group."""
+        by_churn = self._keep(self.count, TENURE_AXIS, CHURN_AXIS)[:len(TENURE_LABELS)]
+        return _tenure_frame({'Total': by_churn.sum(axis=1), 'Churned': by_churn[:, 1]})
+
+    def complaint_by_tenure(self) -> pd.DataFrame:
+        """Churn rate (0-1) per tenure group and complaint status."""
+        counts = self.count[:len(TENURE_LABELS)].sum(axis=CITY_AXIS)
+        total, churned = counts.sum(axis=-1), counts[..., 1]
+        rows = [
+            {'TenureGroup': label, 'Complain': complain, 'Churn': churned[t, c] / total[t, c]}
+            for t, label in enumerate(TENURE_LABELS)
+            for c, complain in enumerate(COMPLAIN_LEVELS)
+            if total[t, c]
+        ]
+        df = pd.DataFrame(rows)
+        df['TenureGroup'] = pd.Categorical(df['TenureGroup'], categories=TENURE_LABELS, ordered=True)
+        return df
+
+    def satisfaction_by_tenure(self) -> pd.DataFrame:
+        """Mean satisfaction score and churn rate (0-1) per tenure group."""
+        sat_sum = self._keep(self.sums['SatisfactionScore'], TENURE_AXIS)[:len(TENURE_LABELS)]
+        sat_n = self._keep(self.nonnull['SatisfactionScore'], TENURE_AXIS)[:len(TENURE_LABELS)]
+        cohort = self.tenure_cohort()
+        return _tenure_frame({
+            'Avg_Satisfaction': sat_sum / sat_n,
+            'Churn_Rate': cohort['Churned'] / cohort['Total']
+        })
+
+    def cashback_by_tenure(self) -> pd.DataFrame:
+        """Mean cashback per tenure group, split by churned (1) / retained (0)."""
+        cash_sum = self._keep(self.sums['CashbackAmount'], TENURE_AXIS, CHURN_AXIS)
+        cash_n = self._keep(self.nonnull['CashbackAmount'], TENURE_AXIS, CHURN_AXIS)
+        rows = [
+            {'TenureGroup': label, 'Churn': churn, 'Avg_Cashback': cash_sum[t, c] / cash_n[t, c]}
+            for t, label in enumerate(TENURE_LABELS)
+            for c, churn in enumerate(CHURN_LEVELS)
+            if cash_n[t, c]
+        ]
+        df = pd.DataFrame(rows)
+        df['TenureGroup'] = pd.Categorical(df['TenureGroup'], categories=TENURE_LABELS, ordered=True)
+        return df
+
+    def city_tier(self) -> pd.DataFrame:
+        """Total and churned customers per city tier (all tenures, including unknown)."""
+        by_churn = self._keep(self.count, CITY_AXIS, CHURN_AXIS)
+        return pd.DataFrame({
+            'CityTier': CITY_TIERS,
+            'Total': by_churn.sum(axis=1),
+            'Churned': by_churn[:, 1]
+        })
+
+
+def load_cube() -> CohortCube:
+    """The persisted cube for the current dataset.
+
+    If the workbook changed only by new customers they are folded into the
+    saved cube; any other change rebuilds it.
+    """
+    version = dataset_version()
+    cube = None
+    if CUBE_PATH.exists():
+        try:
+            cube = CohortCube.load(CUBE_PATH)
+            if cube.source_version == version:
+                return cube
+        except (OSError, ValueError, KeyError):
+            cube = None
+    df = load_dataset()
+    if cube is None or not cube.add_new(df):
+        cube = CohortCube.from_frame(df)
+    cube.source_version = version
+    cube.save(CUBE_PATH)
+    return cube
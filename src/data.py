@@ -0,0 +1,137 @@
+"""Columnar cache of the raw E Commerce workbook.
+
+Parsing the .xlsx with openpyxl costs over a second on every cold start, so the
+sheet is converted once into an uncompressed Feather (Arrow IPC) file under
+data/processed/ with compact dtypes, and memory-mapped on every later load.
+The cache is rebuilt whenever the workbook's contents change.
+"""
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.cache import file_digest
+
+ROOT = Path(__file__).resolve().parent.parent
+DATASET_PATH = ROOT / 'data' / 'raw' / 'E Commerce Dataset.xlsx'
+SHEET_NAME = 'E Comm'
+
+PROCESSED_DIR = ROOT / 'data' / 'processed'
+DATASET_CACHE = PROCESSED_DIR / 'ecommerce.feather'
+DATASET_META = PROCESSED_DIR / 'ecommerce.meta.json'
+
+# Text columns become categoricals; float columns below only hold whole numbers
+# (with gaps), so float32 is exact — CashbackAmount keeps float64 for its decimals
+COLUMN_DTYPES = {
+    'CustomerID': np.int32,
+    'Churn': np.int8,
+    'Tenure': np.float32,
+    'CityTier': np.int8,
+    'WarehouseToHome': np.float32,
+    'HourSpendOnApp': np.float32,
+    'NumberOfDeviceRegistered': np.int8,
+    'SatisfactionScore': np.int8,
+    'NumberOfAddress': np.int8,
+    'Complain': np.int8,
+    'OrderAmountHikeFromlastYear': np.float32,
+    'CouponUsed': np.float32,
+    'OrderCount': np.float32,
+    'DaySinceLastOrder': np.float32,
+    'CashbackAmount': np.float64
+}
+
+
+def compact_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """Cast known columns to COLUMN_DTYPES and text columns to categoricals."""
+    dtypes = {col: dtype for col, dtype in COLUMN_DTYPES.items() if col in df.columns}
+    for col in df.columns:
+        if col not in dtypes and not pd.api.types.is_numeric_dtype(df[col]):
+            dtypes[col] = 'category'
+    return df.astype(dtypes)
+
+
+def read_workbook(source: Path = DATASET_PATH) -> pd.DataFrame:
+    """Parse the customer sheet straight from Excel (slow — prefer load_dataset)."""
+    return compact_dtypes(pd.read_excel(source, sheet_name=SHEET_NAME))
+
+
+def _read_meta() -> dict:
+    try:
+        with open(DATASET_META) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_meta(meta: dict) -> None:
+    tmp = DATASET_META.with_suffix('.tmp')
+    with open(tmp, 'w') as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp, DATASET_META)
+
+
+def cache_is_fresh(source: Path = DATASET_PATH) -> bool:
+    """True if the Feather cache was built from the current contents of `source`.
+
+    mtime and size are checked first; the SHA-256 is only computed when they
+    changed, so touching the workbook without editing it doesn't force a rebuild.
+    """
+    if not DATASET_CACHE.exists():
+        return False
+    meta = _read_meta()
+    stat = os.stat(source)
+    if meta.get('mtime_ns') == stat.st_mtime_ns and meta.get('size') == stat.st_size:
+        return True
+    if meta.get('sha256') == file_digest(source):
+        _write_meta({**meta, 'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size})
+        return True
+    return False
+
+
+def build_dataset_cache(source: Path = DATASET_PATH) -> pd.DataFrame:
+    """Convert the workbook into the Feather cache and return the parsed frame."""
+    from pyarrow import feather
+
+    df = read_workbook(source)
+    PROCESSED_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = DATASET_CACHE.with_suffix('.tmp')
+    # Uncompressed so later loads can memory-map it instead of decompressing
+    feather.write_feather(df, tmp, compression='uncompressed')
+    os.replace(tmp, DATASET_CACHE)
+    stat = os.stat(source)
+    _write_meta({
+        'source': source.name,
+        'sheet': SHEET_NAME,
+        'sha256': file_digest(source),
+        'mtime_ns': stat.st_mtime_ns,
+        'size': stat.st_size,
+        'rows': len(df)
+    })
+    return df
+
+
+def load_dataset(source: Path = DATASET_PATH) -> pd.DataFrame:
+    """The customer dataset, from the memory-mapped cache when it is fresh.
+
+    Falls back to parsing the workbook directly if pyarrow isn't installed.
+    """
+    try:
+        from pyarrow import feather
+    except ImportError:
+        return read_workbook(source)
+    if not cache_is_fresh(source):
+        return build_dataset_cache(source)
+    return feather.read_table(DATASET_CACHE, memory_map=True).to_pandas()
+
+
+def dataset_version(source: Path = DATASET_PATH) -> str:
+    """SHA-256 of the workbook contents, refreshing the Feather cache if it is stale."""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return file_digest(source)
+    if not cache_is_fresh(source):
+        build_dataset_cache(source)
+    return _read_meta()['sha256']
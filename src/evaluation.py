@@ -0,0 +1,154 @@
+"""Persisted evaluation of the churn model on the held-out test set.
+
+Scoring test_data.csv and computing the confusion matrix, classification
+report and ROC curve used to happen on every Model Transparency rerun. The
+results are now written once per (model, test data) pair to a JSON artifact
+named after both content hashes, so a retrained model or a new test split
+gets a fresh evaluation and older ones stay on disk to compare against:
+
+    python -m src.evaluation                  # build/show the current evaluation
+    python -m src.evaluation diff KEY_A KEY_B # compare two evaluations' metrics
+"""
+import argparse
+import json
+import math
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.cache import cached_file_digest
+from src.data import PROCESSED_DIR, ROOT
+from src.features import FEATURE_ORDER
+from src.inference import DECISION_THRESHOLD, get_model, model_version, predict_batch
+
+TEST_DATA_PATH = ROOT / 'data' / 'raw' / 'test_data.csv'
+EVALUATION_DIR = PROCESSED_DIR / 'evaluations'
+TARGET = 'Churn'
+
+# Cost of one missed churner, used for the revenue-at-risk figure
+REVENUE_PER_CUSTOMER = 5000
+
+_memo = {}
+_lock = threading.Lock()
+
+
+def evaluation_key(test_path: Path = TEST_DATA_PATH) -> str:
+    """Content address of the current evaluation: model hash + test data hash."""
+    return f"{model_version()}-{cached_file_digest(test_path)[:12]}"
+
+
+def evaluation_path(key: str) -> Path:
+    return EVALUATION_DIR / f'{key}.json'
+
+
+def _finite(values: np.ndarray) -> list:
+    # roc_curve's first threshold is +inf, which JSON cannot hold
+    return [float(v) if math.isfinite(v) else None for v in values]
+
+
+def build_evaluation(test_path: Path = TEST_DATA_PATH) -> dict:
+    """Score the test set and compute every metric the transparency page shows."""
+    from sklearn.metrics import (accuracy_score, classification_report, confusion_matrix,
+                                 roc_auc_score, roc_curve)
+
+    model = get_model()
+    test_df = pd.read_csv(test_path)
+    y_test = test_df[TARGET].to_numpy()
+    y_prob = predict_batch(test_df.drop(columns=TARGET))
+    y_pred = (y_prob >= DECISION_THRESHOLD).astype(int)
+
+    tn, fp, fn, tp = (int(v) for v in confusion_matrix(y_test, y_pred).ravel())
+    fpr, tpr, thresholds = roc_curve(y_test, y_prob)
+    return {
+        'key': evaluation_key(test_path),
+        'model_version': model_version(),
+        'test_data_sha256': cached_file_digest(test_path),
+        'threshold': DECISION_THRESHOLD,
+        'samples': int(len(y_test)),
+        'positives': int(y_test.sum()),
+        'accuracy': float(accuracy_score(y_test, y_pred)),
+        'auc': float(roc_auc_score(y_test, y_prob)),
+        'confusion_matrix': {'tn': tn, 'fp': fp, 'fn': fn, 'tp': tp},
+        'revenue_at_risk': fn * REVENUE_PER_CUSTOMER,
+        'classification_report': classification_report(y_test, y_pred, output_dict=True),
+        'roc_curve': {'fpr': fpr.tolist(), 'tpr': tpr.tolist(), 'thresholds': _finite(thresholds)},
+        'feature_importance': feature_importance(model)
+    }
+
+
+def feature_importance(booster) -> dict:
+    """Share of total gain per feature — what XGBClassifier.feature_importances_ reports."""
+    gain = booster.get_score(importance_type='gain')
+    total = sum(gain.values()) or 1.0
+    return {name: float(gain.get(name, 0.0) / total) for name in FEATURE_ORDER}
+
+
+def _write(evaluation: dict, path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix('.tmp')
+    tmp.write_text(json.dumps(evaluation, indent=2))
+    os.replace(tmp, path)
+
+
+def load_evaluation(test_path: Path = TEST_DATA_PATH) -> dict:
+    """The evaluation for the current model and test data, built on first request."""
+    key = evaluation_key(test_path)
+    with _lock:
+        if key in _memo:
+            return _memo[key]
+        path = evaluation_path(key)
+        if path.exists():
+            evaluation = json.loads(path.read_text())
+        else:
+            evaluation = build_evaluation(test_path)
+            _write(evaluation, path)
+        _memo[key] = evaluation
+        return evaluation
+
+
+def list_evaluations() -> list:
+    """Keys of every evaluation on disk, oldest first."""
+    paths = sorted(EVALUATION_DIR.glob('*.json'), key=lambda p: p.stat().st_mtime)
+    return [p.stem for p in paths]
+
+
+def diff_evaluations(key_a: str, key_b: str) -> pd.DataFrame:
+    """Side-by-side headline metrics of two stored evaluations."""
+    rows = {}
+    for key in (key_a, key_b):
+        e = json.loads(evaluation_path(key).read_text())
+        churn = e['classification_report']['1']
+        rows[key] = {
+            'auc': e['auc'], 'accuracy': e['accuracy'],
+            'precision': churn['precision'], 'recall': churn['recall'], 'f1': churn['f1-score'],
+            **e['confusion_matrix']
+        }
+    df = pd.DataFrame(rows)
+    df['delta'] = df[key_b] - df[key_a]
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or compare stored model evaluations.")
+    sub = parser.add_subparsers(dest='command')
+    diff = sub.add_parser('diff', help="compare two stored evaluations")
+    diff.add_argument('key_a')
+    diff.add_argument('key_b')
+    sub.add_parser('list', help="list stored evaluations")
+    args = parser.parse_args()
+
+    if args.command == 'diff':
+        print(diff_evaluations(args.key_a, args.key_b).to_string())
+    elif args.command == 'list':
+        print('\n'.join(list_evaluations()))
+    else:
+        e = load_evaluation()
+        print(f"{e['key']}: AUC {e['auc']:.4f}  accuracy {e['accuracy']:.4f}  "
+              f"({evaluation_path(e['key'])})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""Per-customer SHAP explanations for the churn model.
+
+Exact tree SHAP values come straight from the booster's native contribution
+output (`pred_contribs`), so the heavy `shap` package is only imported if that
+fails. Explanations are cached per feature vector like predictions are.
+"""
+import threading
+from typing import Mapping, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src import inference
+from src.cache import PredictionCache
+from src.features import FEATURE_ORDER, fill_row
+
+explanation_cache = PredictionCache(maxsize=2_000, ttl=inference.CACHE_TTL_SECONDS)
+
+_lock = threading.Lock()
+_fallback_explainer = None
+_fallback_version = None
+
+
+def _native_contributions(matrix: np.ndarray) -> np.ndarray:
+    # Through the executor, so explanations share the process's booster thread budget.
+    # Last column is the bias term (expected log-odds) — drop it
+    return inference.get_executor().contributions(matrix)[:, :-1]
+
+
+def _shap_contributions(matrix: np.ndarray) -> np.ndarray:
+    global _fallback_explainer, _fallback_version
+    import shap
+    with _lock:
+        if _fallback_explainer is None or _fallback_version != inference.model_version():
+            _fallback_explainer = shap.TreeExplainer(inference.get_model())
+            _fallback_version = inference.model_version()
+        values = _fallback_explainer.shap_values(pd.DataFrame(matrix, columns=FEATURE_ORDER))
+    if isinstance(values, list):
+        values = values[1]
+    return np.asarray(values)
+
+
+def contributions(matrix: np.ndarray) -> np.ndarray:
+    """SHAP values (log-odds) for a float32 matrix in FEATURE_ORDER, one row per customer."""
+    from xgboost.core import XGBoostError
+    try:
+        return _native_contributions(matrix)
+    except XGBoostError:
+        return _shap_contributions(matrix)
+
+
+def explain_many(rows: Sequence[Mapping[str, float]]) -> np.ndarray:
+    """SHAP values for several customers' raw inputs, shape (len(rows), 24).
+
+    Cached rows are answered from the explanation cache; the rest are explained in one call.
+    """
+    inference.get_model()
+    keys = [inference.cache_key(raw) for raw in rows]
+    values = np.empty((len(rows), len(FEATURE_ORDER)), dtype=np.float32)
+    missing = []
+    for i, key in enumerate(keys):
+        cached = explanation_cache.get(key)
+        if cached is None:
+            missing.append(i)
+        else:
+            values[i] = cached
+    if missing:
+        matrix = np.empty((len(missing), len(FEATURE_ORDER)), dtype=np.float32)
+        for out, i in zip(matrix, missing):
+            fill_row(rows[i], out)
+        values[missing] = contributions(matrix)
+        for i in missing:
+            explanation_cache.put(keys[i], values[i].copy())
+    return values
+
+
+def explain_one(raw: Mapping[str, float]) -> pd.Series:
+    """SHAP value per model feature for a single customer's raw inputs."""
+    return pd.Series(explain_many([raw])[0], index=FEATURE_ORDER)
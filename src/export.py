@@ -0,0 +1,164 @@
+"""Chunk-streamed exports of scored batch results.
+
+Scored results are already on disk as CSV (see `batch.stream_score`). Exports
+are produced from that file on request, block by block, so a multi-million
+row result is never held as one Python string or DataFrame:
+
+- ``csv``      the scored file itself
+- ``csv.gz``   gzip-compressed CSV
+- ``csv.zst``  zstd-compressed CSV (needs the optional ``zstandard`` package)
+- ``parquet``  Parquet, one row group per block (needs ``pyarrow``)
+
+`iter_export` yields the encoded bytes as they are produced, for callers that
+can stream; `export_file` writes them to a file. Streamlit's download button
+can't stream — it reads the whole file into memory to serve it — so Batch
+Analysis only hands it a file after an explicit "Prepare Download" click.
+"""
+import os
+import uuid
+import zlib
+from pathlib import Path
+from typing import Iterator
+
+from src.features import RAW_FEATURES
+
+# Bytes of CSV read per block; also the approximate Parquet row-group size
+BLOCK_SIZE = 8 << 20
+
+EXPORT_FORMATS = {
+    'csv': ('CSV', 'text/csv'),
+    'csv.gz': ('CSV (gzip)', 'application/gzip'),
+    'csv.zst': ('CSV (zstd)', 'application/zstd'),
+    'parquet': ('Parquet', 'application/vnd.apache.parquet')
+}
+
+# Columns read as float64 whatever the first block holds — pandas writes a
+# whole-number column as 1.0, 2.0, ... in any chunk where one of its cells is
+# blank, which a column typed int64 from the first block can't convert
+_FLOAT_COLUMNS = RAW_FEATURES + ['Churn_Probability', 'AnnualRevenue', 'Priority_Score']
+
+# Scored columns score_frame always fills with integers
+_INT_COLUMNS = ['Customer_ID', 'Churn_Predicted', 'Health_Score']
+
+
+def available_formats() -> list:
+    """Export formats whose optional dependencies are installed."""
+    formats = ['csv', 'csv.gz']
+    try:
+        import zstandard  # noqa: F401
+        formats.append('csv.zst')
+    except ImportError:
+        pass
+    try:
+        import pyarrow.parquet  # noqa: F401
+        formats.append('parquet')
+    except ImportError:
+        pass
+    return formats
+
+
+def _read_blocks(path: Path, block_size: int) -> Iterator[bytes]:
+    with open(path, 'rb') as f:
+        yield from iter(lambda: f.read(block_size), b'')
+
+
+def _iter_gzip(path: Path, block_size: int) -> Iterator[bytes]:
+    # wbits=31 writes a gzip header/trailer, so the output opens with any gunzip
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for block in _read_blocks(path, block_size):
+        out = compressor.compress(block)
+        if out:
+            yield out
+    yield compressor.flush()
+
+
+def _iter_zstd(path: Path, block_size: int) -> Iterator[bytes]:
+    import zstandard
+
+    compressor = zstandard.ZstdCompressor(level=3).compressobj()
+    for block in _read_blocks(path, block_size):
+        out = compressor.compress(block)
+        if out:
+            yield out
+    yield compressor.flush()
+
+
+class _Drain:
+    """Write-only file object whose contents are taken out after every write."""
+
+    def __init__(self):
+        self.chunks = []
+        self.closed = False
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def take(self) -> bytes:
+        data = b''.join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def _iter_parquet(path: Path, block_size: int) -> Iterator[bytes]:
+    import pyarrow as pa
+    import pyarrow.csv as pv
+    import pyarrow.parquet as pq
+
+    read_options = pv.ReadOptions(block_size=block_size)
+    # Any other column the upload carried gets the same treatment if its first
+    # block looks like integers
+    first_block = pv.open_csv(path, read_options=read_options).schema
+    column_types = {field.name: pa.float64() for field in first_block
+                    if pa.types.is_integer(field.type) and field.name not in _INT_COLUMNS}
+    column_types.update({c: pa.float64() for c in _FLOAT_COLUMNS if c in first_block.names})
+    reader = pv.open_csv(path, read_options=read_options,
+                         convert_options=pv.ConvertOptions(column_types=column_types))
+    sink = _Drain()
+    with pq.ParquetWriter(pa.PythonFile(sink, mode='w'), reader.schema) as writer:
+        for batch in reader:
+            writer.write_table(pa.Table.from_batches([batch]))
+            data = sink.take()
+            if data:
+                yield data
+    yield sink.take()
+
+
+def iter_export(path: Path, fmt: str, block_size: int = BLOCK_SIZE) -> Iterator[bytes]:
+    """Yield the scored CSV at `path` encoded as `fmt`, one block at a time."""
+    if fmt == 'csv':
+        return _read_blocks(path, block_size)
+    if fmt == 'csv.gz':
+        return _iter_gzip(path, block_size)
+    if fmt == 'csv.zst':
+        return _iter_zstd(path, block_size)
+    if fmt == 'parquet':
+        return _iter_parquet(path, block_size)
+    raise ValueError(f"Unknown export format {fmt!r}; expected one of {list(EXPORT_FORMATS)}")
+
+
+def export_file(path: Path, fmt: str, dest_dir: Path = None, block_size: int = BLOCK_SIZE) -> Path:
+    """Write the `fmt` export of `path` next to it (or into `dest_dir`) and return its path.
+
+    Plain CSV is the scored file itself, so nothing is written for it.
+    """
+    path = Path(path)
+    if fmt == 'csv':
+        return path
+    dest = Path(dest_dir or path.parent) / f"{path.stem}.{fmt}"
+    # Unique per call: two sessions may export the same cached results at once
+    tmp = dest.with_name(f".{dest.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        with open(tmp, 'wb') as out:
+            for data in iter_export(path, fmt, block_size):
+                out.write(data)
+        os.replace(tmp, dest)
+    finally:
+        tmp.unlink(missing_ok=True)
+    return dest
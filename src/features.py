@@ -0,0 +1,130 @@
+"""Feature schema the churn model was trained on, and the one pipeline that builds it.
+
+Every caller — a single slider-driven customer or a multi-million-row upload —
+goes through `_engineer`, so engineered features are computed the same way
+everywhere. Batch callers get a column-major float32 matrix in FEATURE_ORDER
+that is filled column by column straight from the source data, with no
+intermediate frames.
+"""
+import numpy as np
+import pandas as pd
+
+# The 18 raw customer columns, in the order the notebook trained on
+RAW_FEATURES = [
+    'Tenure', 'PreferredLoginDevice', 'CityTier', 'WarehouseToHome',
+    'PreferredPaymentMode', 'Gender', 'HourSpendOnApp',
+    'NumberOfDeviceRegistered', 'PreferedOrderCat', 'SatisfactionScore',
+    'MaritalStatus', 'NumberOfAddress', 'Complain',
+    'OrderAmountHikeFromlastYear', 'CouponUsed', 'OrderCount',
+    'DaySinceLastOrder', 'CashbackAmount'
+]
+
+# The 6 features engineered in notebooks/EDA.ipynb (Notebook 3)
+ENGINEERED_FEATURES = [
+    'engagement_score', 'order_frequency', 'cashback_per_order',
+    'is_new_customer', 'high_risk', 'device_loyalty'
+]
+
+# What `_engineer` computes, in words — recorded in the model manifest so a
+# model is never served with features defined differently from its training
+ENGINEERED_DEFINITIONS = {
+    'engagement_score': 'HourSpendOnApp * OrderCount',
+    'order_frequency': 'OrderCount / (DaySinceLastOrder + 1)',
+    'cashback_per_order': 'CashbackAmount / (OrderCount + 1)',
+    'is_new_customer': 'Tenure < 3',
+    'high_risk': 'Complain == 1 and SatisfactionScore <= 2',
+    'device_loyalty': 'NumberOfDeviceRegistered'
+}
+
+# Column order the model expects — every caller must match this exactly
+FEATURE_ORDER = RAW_FEATURES + ENGINEERED_FEATURES
+
+# dtypes used when engineered features are added to a DataFrame
+# (device_loyalty keeps the dtype of NumberOfDeviceRegistered)
+ENGINEERED_DTYPES = {
+    'engagement_score': np.float32,
+    'order_frequency': np.float32,
+    'cashback_per_order': np.float32,
+    'is_new_customer': np.int8,
+    'high_risk': np.int8
+}
+
+_N_RAW = len(RAW_FEATURES)
+_RAW_INDEX = {name: i for i, name in enumerate(RAW_FEATURES)}
+
+
+def _engineer(col, out):
+    """Compute the engineered features in place.
+
+    `col(name)` returns raw column `name` as a 1-D array; `out` holds one
+    preallocated 1-D array per ENGINEERED_FEATURES entry, in that order.
+    """
+    engagement, frequency, per_order, is_new, high_risk, loyalty = out
+    orders = col('OrderCount')
+    np.multiply(col('HourSpendOnApp'), orders, out=engagement)
+    np.divide(orders, col('DaySinceLastOrder') + 1, out=frequency)
+    np.divide(col('CashbackAmount'), orders + 1, out=per_order)
+    np.less(col('Tenure'), 3, out=is_new)
+    np.logical_and(col('Complain') == 1, col('SatisfactionScore') <= 2, out=high_risk)
+    np.copyto(loyalty, col('NumberOfDeviceRegistered'), casting='unsafe')
+
+
+def _engineer_into(col, matrix):
+    _engineer(col, [matrix[:, _N_RAW + k] for k in range(len(ENGINEERED_FEATURES))])
+
+
+def missing_features(columns) -> list:
+    """Raw feature columns absent from `columns`."""
+    return [c for c in RAW_FEATURES if c not in columns]
+
+
+def feature_matrix(data, out=None) -> np.ndarray:
+    """Model input for every row of `data` as an (n, 24) float32 array in FEATURE_ORDER.
+
+    `data` is a DataFrame holding the RAW_FEATURES columns (any others, including
+    precomputed engineered columns, are ignored) or an (n, 18) array in
+    RAW_FEATURES order. Pass `out` to reuse a preallocated array. The result is
+    Fortran-ordered so each column write is contiguous; XGBoost reads it as is.
+    """
+    if isinstance(data, pd.DataFrame):
+        missing = missing_features(data.columns)
+        if missing:
+            raise ValueError(f"Missing required columns: {', '.join(missing)}")
+    if out is None:
+        out = np.empty((len(data), len(FEATURE_ORDER)), dtype=np.float32, order='F')
+    if isinstance(data, pd.DataFrame):
+        col = lambda name: data[name].to_numpy()
+        for i, name in enumerate(RAW_FEATURES):
+            out[:, i] = col(name)
+    else:
+        col = lambda name: data[:, _RAW_INDEX[name]]
+        out[:, :_N_RAW] = data
+    # Engineer from the source columns, not the float32 copies, so ratios round exactly once
+    _engineer_into(col, out)
+    return out
+
+
+def fill_row(raw, out):
+    """Write one customer's raw inputs and engineered features into `out` in FEATURE_ORDER.
+
+    `raw` maps the 18 RAW_FEATURES to values (any engineered keys are ignored and
+    recomputed); `out` is a 1-D float array of length len(FEATURE_ORDER).
+    """
+    values = np.array([raw[name] for name in RAW_FEATURES], dtype=np.float64)
+    out[:_N_RAW] = values
+    _engineer_into(lambda name: values[_RAW_INDEX[name]:_RAW_INDEX[name] + 1], out.reshape(1, -1))
+    return out
+
+
+def engineer_features(data: pd.DataFrame) -> pd.DataFrame:
+    """Add the 6 engineered columns to `data` in place and return it.
+
+    Ratios are float32 and flags int8, matching what the model sees.
+    """
+    n = len(data)
+    out = [np.empty(n, dtype=ENGINEERED_DTYPES.get(name, data['NumberOfDeviceRegistered'].dtype))
+           for name in ENGINEERED_FEATURES]
+    _engineer(lambda name: data[name].to_numpy(), out)
+    for name, values in zip(ENGINEERED_FEATURES, out):
+        data[name] = values
+    return data
@@ -0,0 +1,269 @@
+"""Process-wide churn model handle and prediction API.
+
+Every page scores through this module, so the native model file is verified
+against its manifest (src.model_store), loaded and warmed up once per process
+instead of once per page cache entry, and every caller is checked against the
+feature order the model was trained on.
+
+Single customers go through a fast path that skips pandas entirely: the raw
+inputs and engineered features are written into a preallocated float32 row
+and scored with the booster's `inplace_predict`. Raw-input predictions are
+memoised in a bounded LRU/TTL cache keyed on (model version, feature tuple),
+which is cleared whenever the model file on disk changes.
+
+Every booster call goes through an `InferenceExecutor`, which keeps the total
+number of XGBoost threads within the process's budget however many sessions
+are scoring at once (see `configure`).
+"""
+import os
+import threading
+from pathlib import Path
+from typing import Mapping, Sequence
+
+import numpy as np
+
+from src.cache import PredictionCache, cached_file_digest
+from src.features import FEATURE_ORDER, RAW_FEATURES, feature_matrix, fill_row
+from src.model_store import NATIVE_MODEL_PATH, ModelIntegrityError, manifest_path
+
+MODEL_PATH = NATIVE_MODEL_PATH
+
+# Probability at or above which a customer is predicted to churn
+DECISION_THRESHOLD = 0.5
+
+# Streamlit reruns re-score the same inputs constantly — keep recent answers for an hour
+CACHE_SIZE = 10_000
+CACHE_TTL_SECONDS = 3600
+
+# Booster threads this process may use in total (0 = every core), and how many
+# large batches may score at once, each with an equal share of them
+INFERENCE_THREADS = int(os.environ.get('CHURN_INFERENCE_THREADS', 0))
+BATCH_SLOTS = int(os.environ.get('CHURN_BATCH_SLOTS', 2))
+
+# Inputs up to this many rows are scored on the caller's thread with one booster thread
+SMALL_BATCH_ROWS = 512
+
+_lock = threading.Lock()
+_model = None
+_booster = None
+_executor = None
+_model_version = None
+_model_signature = None
+_failed_signature = None
+_threads = INFERENCE_THREADS
+_batch_slots = BATCH_SLOTS
+
+prediction_cache = PredictionCache(maxsize=CACHE_SIZE, ttl=CACHE_TTL_SECONDS)
+
+# One reusable input row per thread — Streamlit runs each session on its own thread
+_local = threading.local()
+
+
+def load_model(path: Path = MODEL_PATH):
+    """Load the verified booster and run one warm-up prediction.
+
+    Raises src.model_store.ModelIntegrityError if the file doesn't match its
+    manifest or the manifest doesn't match src.features.
+    """
+    # Imports xgboost — only pay for it once something scores
+    from src.model_store import load_booster
+
+    booster = load_booster(path)
+    # The first predict call builds XGBoost's predictor — pay for it here, not on a user click
+    booster.inplace_predict(np.zeros((1, len(FEATURE_ORDER)), dtype=np.float32))
+    return booster
+
+
+class InferenceExecutor:
+    """Runs booster predictions without oversubscribing the cores.
+
+    XGBoost starts one OpenMP team per call sized to every core, so N sessions
+    scoring at once ask for N × cores threads. Here, small inputs (single
+    customers, what-if grids) are scored on the caller's thread by a one-thread
+    copy of the booster — no team to start, and any number of sessions can do
+    so at once. Larger batches take one of `batch_slots` slots and score with
+    an equal share of `threads`; extra batches wait for a slot instead of
+    adding threads.
+    """
+
+    def __init__(self, booster, threads: int = 0, batch_slots: int = BATCH_SLOTS,
+                 small_rows: int = SMALL_BATCH_ROWS):
+        threads = threads or os.cpu_count() or 1
+        self.batch_slots = max(min(batch_slots, threads), 1)
+        self.batch_threads = max(threads // self.batch_slots, 1)
+        self.small_rows = small_rows
+        self._single = booster.copy()
+        self._single.set_param({'nthread': 1})
+        self._batch = booster.copy()
+        self._batch.set_param({'nthread': self.batch_threads})
+        self._slots = threading.BoundedSemaphore(self.batch_slots)
+        warmup = np.zeros((1, len(FEATURE_ORDER)), dtype=np.float32)
+        self._single.inplace_predict(warmup)
+        self._batch.inplace_predict(warmup)
+
+    def predict(self, matrix: np.ndarray) -> np.ndarray:
+        """Churn probability for each row of an (n, 24) model-input matrix."""
+        if len(matrix) <= self.small_rows:
+            return self._single.inplace_predict(matrix)
+        with self._slots:
+            return self._batch.inplace_predict(matrix)
+
+    def contributions(self, matrix: np.ndarray) -> np.ndarray:
+        """Per-feature SHAP values (log-odds) for an (n, 24) matrix, bias term in the last column."""
+        import xgboost as xgb
+
+        if len(matrix) <= self.small_rows:
+            dmatrix = xgb.DMatrix(matrix, feature_names=FEATURE_ORDER, nthread=1)
+            return self._single.predict(dmatrix, pred_contribs=True)
+        with self._slots:
+            dmatrix = xgb.DMatrix(matrix, feature_names=FEATURE_ORDER, nthread=self.batch_threads)
+            return self._batch.predict(dmatrix, pred_contribs=True)
+
+
+def configure(threads: int = None, batch_slots: int = None) -> None:
+    """Change this process's booster thread budget, e.g. to 1 in each worker of a process pool."""
+    global _threads, _batch_slots, _executor
+    with _lock:
+        if threads is not None:
+            _threads = threads
+        if batch_slots is not None:
+            _batch_slots = batch_slots
+        if _booster is not None:
+            _executor = InferenceExecutor(_booster, _threads, _batch_slots)
+
+
+def _file_signature(path: Path):
+    # The manifest is part of the model: a new one alone must trigger a reload too
+    model, manifest = os.stat(path), os.stat(manifest_path(path))
+    return model.st_mtime_ns, model.st_size, manifest.st_mtime_ns, manifest.st_size
+
+
+def get_model():
+    """Return the shared booster, loading it on first use and reloading it if the file changed.
+
+    If a changed file fails verification — e.g. read between a promotion
+    replacing the model and its manifest — the loaded booster keeps serving,
+    and the reload is retried once either file changes again.
+    """
+    global _model, _booster, _executor, _model_version, _model_signature, _failed_signature
+    try:
+        signature = _file_signature(MODEL_PATH)
+    except OSError:
+        # Keep serving the loaded model if the file is briefly missing mid-deploy
+        if _model is None:
+            raise
+        signature = _model_signature
+    if _model is not None and signature == _failed_signature:
+        signature = _model_signature
+    if _model is None or signature != _model_signature:
+        with _lock:
+            if _model is None or signature != _model_signature:
+                try:
+                    model = load_model(MODEL_PATH)
+                except (OSError, ModelIntegrityError):
+                    if _model is None:
+                        raise
+                    _failed_signature = signature
+                    return _model
+                _booster = model
+                _executor = InferenceExecutor(_booster, _threads, _batch_slots)
+                _model_version = cached_file_digest(MODEL_PATH)[:12]
+                _model_signature = signature
+                _model = model
+                prediction_cache.clear()
+    return _model
+
+
+def get_booster():
+    """Return the shared XGBoost booster (the same object as `get_model()`)."""
+    get_model()
+    return _booster
+
+
+def get_executor() -> InferenceExecutor:
+    """Return the executor scoring through the shared model."""
+    get_model()
+    return _executor
+
+
+def model_version() -> str:
+    """Short SHA-256 of the model file the shared model is (or would be) loaded from.
+
+    Doesn't load the model: pages that only look up results cached under a
+    model version never import xgboost.
+    """
+    if _model is None:
+        return cached_file_digest(MODEL_PATH)[:12]
+    get_model()
+    return _model_version
+
+
+def cache_key(raw: Mapping[str, float]):
+    """Cache key for a customer's raw inputs under the loaded model version."""
+    return _model_version, tuple(float(raw[name]) for name in RAW_FEATURES)
+
+
+def predict_batch(data) -> np.ndarray:
+    """Churn probability for every row of raw customer data.
+
+    `data` is a DataFrame with the 18 RAW_FEATURES columns or an (n, 18) array in
+    that order. Engineered features are always recomputed by src.features, so
+    precomputed ones in `data` are ignored.
+    """
+    return get_executor().predict(feature_matrix(data))
+
+
+def predict_batch_versioned(data):
+    """`predict_batch`, plus the version of the model that produced the probabilities.
+
+    The executor and version are read together, so a reload finishing mid-call
+    can't pair one model's scores with another's version.
+    """
+    get_model()
+    with _lock:
+        executor, version = _executor, _model_version
+    return executor.predict(feature_matrix(data)), version
+
+
+def feature_row(raw: Mapping[str, float]) -> np.ndarray:
+    """Return a new (1, 24) float32 array holding the customer's model features."""
+    row = np.empty((1, len(FEATURE_ORDER)), dtype=np.float32)
+    fill_row(raw, row[0])
+    return row
+
+
+def predict_one(raw: Mapping[str, float]) -> float:
+    """Churn probability for a single customer given the 18 raw inputs.
+
+    Engineered features are computed here, so callers never build them by hand.
+    """
+    executor = get_executor()
+    key = cache_key(raw)
+    prob = prediction_cache.get(key)
+    if prob is None:
+        row = getattr(_local, 'row', None)
+        if row is None:
+            row = _local.row = np.empty((1, len(FEATURE_ORDER)), dtype=np.float32)
+        fill_row(raw, row[0])
+        prob = float(executor.predict(row)[0])
+        prediction_cache.put(key, prob)
+    return prob
+
+
+def predict_many(rows: Sequence[Mapping[str, float]]) -> np.ndarray:
+    """Churn probabilities for several customers' raw inputs.
+
+    Cached rows are answered from the prediction cache; the rest are scored in one booster call.
+    """
+    executor = get_executor()
+    keys = [cache_key(raw) for raw in rows]
+    probs = np.array([prediction_cache.get(key) for key in keys], dtype=np.float64)
+    missing = np.flatnonzero(np.isnan(probs))
+    if len(missing):
+        matrix = np.empty((len(missing), len(FEATURE_ORDER)), dtype=np.float32)
+        for out, i in zip(matrix, missing):
+            fill_row(rows[i], out)
+        probs[missing] = executor.predict(matrix)
+        for i in missing:
+            prediction_cache.put(keys[i], float(probs[i]))
+    return probs
@@ -0,0 +1,194 @@
+"""Background batch scoring jobs.
+
+Scoring a large upload used to run on the Streamlit script thread, so the page
+sat inside a spinner until every row was done and a reload threw the work
+away. `JobRunner` instead hands each upload to a small worker pool and returns
+a job ID at once. Each job's status and progress are written to a JSON file,
+and the job can be polled, cancelled or have its results loaded by ID. Job
+records share one directory, so there is no way to enumerate them: callers
+ask only about the IDs they were given (Batch Analysis keeps its session's
+IDs in `st.session_state`).
+"""
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+from src.batch import load_scored, score_upload
+from src.data import PROCESSED_DIR
+
+JOBS_DIR = PROCESSED_DIR / 'jobs'
+
+# Scoring releases the GIL inside XGBoost and the CSV parser, so threads
+# overlap well; more workers than this just split the same cores
+JOB_WORKERS = 2
+
+# Finished job records kept on disk; older ones are pruned on submit
+JOBS_KEPT = 50
+
+ACTIVE = ('queued', 'running')
+
+
+class JobCancelled(Exception):
+    """Raised inside a job's progress callback to stop it between chunks."""
+
+
+class JobRunner:
+    """Process-wide pool of batch scoring jobs with persisted status."""
+
+    def __init__(self, root: Path = JOBS_DIR, workers: int = JOB_WORKERS):
+        self.root = Path(root)
+        self.workers = workers
+        self._executor = None
+        self._jobs = {}       # job_id -> status dict, for jobs started by this process
+        self._cancel = {}     # job_id -> threading.Event
+        self._holders = {}    # job_id -> submits sharing the job, for jobs still active
+        self._futures = {}
+        self._lock = threading.Lock()
+
+    def _path(self, job_id: str) -> Path:
+        return self.root / f'{job_id}.json'
+
+    def _save(self, job: dict) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self._path(job['id'])
+        tmp = path.with_suffix(f'.tmp-{uuid.uuid4().hex}')
+        tmp.write_text(json.dumps(job, indent=2))
+        os.replace(tmp, path)
+
+    def _update(self, job_id: str, **fields) -> None:
+        with self._lock:
+            job = self._jobs[job_id]
+            job.update(fields)
+            snapshot = dict(job)
+        self._save(snapshot)
+
+    def submit(self, source, key: str, total_rows: int, name: str = '') -> str:
+        """Queue `source` (a binary CSV file object) for scoring into results entry `key`.
+
+        Returns the job ID. An upload already being scored returns the running
+        job, and one already in the results cache gets a job that is done at once.
+        """
+        with self._lock:
+            for job_id, job in self._jobs.items():
+                if job['key'] == key and job['status'] in ACTIVE:
+                    self._holders[job_id] += 1
+                    return job_id
+        job_id = uuid.uuid4().hex[:12]
+        job = {
+            'id': job_id, 'key': key, 'name': name, 'status': 'queued',
+            'rows_done': 0, 'total_rows': total_rows, 'error': None,
+            'created': time.time(), 'started': None, 'finished': None
+        }
+        if load_scored(key) is not None:
+            job.update(status='done', rows_done=total_rows, started=job['created'], finished=job['created'])
+        with self._lock:
+            self._jobs[job_id] = job
+            self._cancel[job_id] = threading.Event()
+            self._holders[job_id] = 1
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix='batch-job')
+        self._save(job)
+        if job['status'] == 'queued':
+            self._futures[job_id] = self._executor.submit(self._run, job_id, source, key)
+        self.prune()
+        return job_id
+
+    def _run(self, job_id: str, source, key: str) -> None:
+        cancelled = self._cancel[job_id]
+        if cancelled.is_set():
+            self._update(job_id, status='cancelled', finished=time.time())
+            return
+        self._update(job_id, status='running', started=time.time())
+
+        def progress(rows_done):
+            if cancelled.is_set():
+                raise JobCancelled
+            self._update(job_id, rows_done=rows_done)
+
+        try:
+            # A cancelled or failed build leaves nothing behind in the results cache
+            score_upload(source, key, progress=progress)
+        except JobCancelled:
+            self._update(job_id, status='cancelled', finished=time.time())
+        except Exception as e:
+            self._update(job_id, status='failed', error=str(e), finished=time.time())
+        else:
+            self._update(job_id, status='done', finished=time.time())
+        finally:
+            self._futures.pop(job_id, None)
+
+    def get(self, job_id: str) -> Optional[dict]:
+        """Current status of a job, or None if the ID is unknown."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                return dict(job)
+        try:
+            job = json.loads(self._path(job_id).read_text())
+        except (OSError, ValueError):
+            return None
+        if job['status'] in ACTIVE:
+            # Its worker died with a previous server process
+            job['status'] = 'interrupted'
+        return job
+
+    def cancel(self, job_id: str) -> bool:
+        """Withdraw one submit of a queued or running job; True if the job will stop.
+
+        A job shared by several submits of the same upload keeps running until
+        each of them has cancelled it. False if the job is still held by
+        another submit, or is not active here.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job['status'] not in ACTIVE:
+                return False
+            self._holders[job_id] -= 1
+            if self._holders[job_id] > 0:
+                return False
+            self._cancel[job_id].set()
+        future = self._futures.get(job_id)
+        if future is not None and future.cancel():
+            self._update(job_id, status='cancelled', finished=time.time())
+        return True
+
+    def result(self, job_id: str):
+        """(entry folder, BatchSummary) of a finished job, or None if unavailable or evicted."""
+        job = self.get(job_id)
+        if job is None or job['status'] != 'done':
+            return None
+        return load_scored(job['key'])
+
+    def _records(self) -> list:
+        # Job record files, most recently updated first
+        records = []
+        for path in self.root.glob('*.json'):
+            try:
+                records.append((path.stat().st_mtime, path))
+            except OSError:
+                continue  # pruned meanwhile
+        return [path for _, path in sorted(records, reverse=True)]
+
+    def list(self, job_ids, limit: int = 10) -> list:
+        """The known jobs among `job_ids`, most recent first."""
+        jobs = [self.get(job_id) for job_id in job_ids]
+        return sorted((job for job in jobs if job is not None), key=lambda j: j['created'], reverse=True)[:limit]
+
+    def prune(self, keep: int = JOBS_KEPT) -> None:
+        """Delete the oldest finished job records beyond `keep`."""
+        for path in self._records()[keep:]:
+            with self._lock:
+                if self._jobs.get(path.stem, {}).get('status') in ACTIVE:
+                    continue
+                self._jobs.pop(path.stem, None)
+                self._cancel.pop(path.stem, None)
+                self._holders.pop(path.stem, None)
+            path.unlink(missing_ok=True)
+
+
+runner = JobRunner()
@@ -0,0 +1,153 @@
+"""The deployed model as a native XGBoost file with a checksummed manifest.
+
+The model used to ship as a joblib pickle of the scikit-learn wrapper: slow
+to load, readable only by library versions close to the ones that wrote it,
+and able to run arbitrary code when unpickled. It is now stored as a bare
+booster in XGBoost's UBJSON format, next to a JSON manifest recording what
+the app has to agree with to serve it — feature order, engineered-feature
+definitions, decision and risk thresholds, the XGBoost version that wrote it
+and the file's SHA-256. `load_booster` refuses a file that doesn't match.
+
+    python -m src.model_store export notebooks/best_churn_model.pkl   # pickle from the notebook → native
+    python -m src.model_store verify
+"""
+import argparse
+import hashlib
+import json
+import os
+import time
+import uuid
+from pathlib import Path
+
+from src.features import ENGINEERED_DEFINITIONS, FEATURE_ORDER, RAW_FEATURES
+
+MODEL_DIR = Path(__file__).resolve().parent
+NATIVE_MODEL_PATH = MODEL_DIR / 'churn_model.ubj'
+
+MANIFEST_FORMAT = 1
+
+
+class ModelIntegrityError(ValueError):
+    """The model file doesn't match its manifest, or the manifest doesn't match this code."""
+
+
+def manifest_path(model_path: Path) -> Path:
+    return model_path.with_suffix('.manifest.json')
+
+
+def _version(text: str) -> tuple:
+    return tuple(int(part) for part in text.split('.')[:2] if part.isdigit())
+
+
+def read_manifest(model_path: Path = NATIVE_MODEL_PATH) -> dict:
+    try:
+        return json.loads(manifest_path(model_path).read_text())
+    except (OSError, ValueError) as e:
+        raise ModelIntegrityError(f"No readable manifest for {model_path.name}: {e}") from None
+
+
+def _check(manifest: dict, data: bytes, model_path: Path) -> None:
+    import xgboost
+
+    digest = hashlib.sha256(data).hexdigest()
+    if digest != manifest.get('sha256'):
+        raise ModelIntegrityError(f"{model_path.name} has SHA-256 {digest[:12]}, "
+                                  f"its manifest expects {str(manifest.get('sha256'))[:12]}")
+    if manifest.get('feature_order') != FEATURE_ORDER:
+        raise ModelIntegrityError(f"Model was trained on {manifest.get('feature_order')}, expected {FEATURE_ORDER}")
+    if manifest.get('engineered_features') != ENGINEERED_DEFINITIONS:
+        raise ModelIntegrityError("Model was trained on differently defined engineered features: "
+                                  f"{manifest.get('engineered_features')}")
+    # Older XGBoost releases can load newer model files yet score them wrongly
+    # (e.g. < 3.1 reads the vector base_score as 0.5), so refuse instead
+    if _version(xgboost.__version__) < _version(manifest.get('xgboost_version', '0')):
+        raise ModelIntegrityError(f"{model_path.name} was written by XGBoost {manifest['xgboost_version']}; "
+                                  f"XGBoost {xgboost.__version__} is installed")
+
+
+def verify(model_path: Path = NATIVE_MODEL_PATH) -> dict:
+    """The manifest of `model_path`, after checking the file against it; raises ModelIntegrityError."""
+    manifest = read_manifest(model_path)
+    _check(manifest, model_path.read_bytes(), model_path)
+    return manifest
+
+
+def load_booster(model_path: Path = NATIVE_MODEL_PATH):
+    """The verified booster stored at `model_path`."""
+    import xgboost as xgb
+
+    manifest = read_manifest(model_path)
+    data = model_path.read_bytes()
+    # Checked and loaded from the same bytes, so the file can't change in between
+    _check(manifest, data, model_path)
+    booster = xgb.Booster()
+    booster.load_model(bytearray(data))
+    booster.feature_names = FEATURE_ORDER
+    return booster
+
+
+def save_native(model, model_path: Path = NATIVE_MODEL_PATH) -> dict:
+    """Write `model` (an XGBClassifier or Booster) as native UBJSON plus manifest; returns the manifest.
+
+    Both files are replaced atomically — the model first, so a reader that sees
+    the new manifest always finds the file it describes.
+    """
+    import xgboost
+
+    from src.batch import HIGH_RISK_THRESHOLD, MEDIUM_RISK_THRESHOLD
+    from src.inference import DECISION_THRESHOLD
+
+    booster = model.get_booster() if hasattr(model, 'get_booster') else model
+    if booster.feature_names is not None and list(booster.feature_names) != FEATURE_ORDER:
+        raise ModelIntegrityError(f"Model was trained on {booster.feature_names}, expected {FEATURE_ORDER}")
+    data = bytes(booster.save_raw(raw_format='ubj'))
+    manifest = {
+        'format': MANIFEST_FORMAT,
+        'model_file': model_path.name,
+        'model_format': 'ubj',
+        'sha256': hashlib.sha256(data).hexdigest(),
+        'xgboost_version': xgboost.__version__,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'num_boosted_rounds': booster.num_boosted_rounds(),
+        'raw_features': RAW_FEATURES,
+        'engineered_features': ENGINEERED_DEFINITIONS,
+        'feature_order': FEATURE_ORDER,
+        'thresholds': {
+            'churn_predicted': DECISION_THRESHOLD,
+            'high_risk': HIGH_RISK_THRESHOLD,
+            'medium_risk': MEDIUM_RISK_THRESHOLD
+        }
+    }
+    tag = uuid.uuid4().hex
+    tmp_model = model_path.with_name(f'.{model_path.name}.{tag}')
+    tmp_manifest = model_path.with_name(f'.{manifest_path(model_path).name}.{tag}')
+    tmp_model.write_bytes(data)
+    tmp_manifest.write_text(json.dumps(manifest, indent=2) + '\n')
+    os.replace(tmp_model, model_path)
+    os.replace(tmp_manifest, manifest_path(model_path))
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export or verify the native churn model.")
+    sub = parser.add_subparsers(dest='command', required=True)
+    export = sub.add_parser('export', help="convert a pickled XGBClassifier into the native model + manifest")
+    export.add_argument('pickle', type=Path)
+    export.add_argument('--output', type=Path, default=NATIVE_MODEL_PATH)
+    check = sub.add_parser('verify', help="check the native model against its manifest")
+    check.add_argument('--model', type=Path, default=NATIVE_MODEL_PATH)
+    args = parser.parse_args()
+
+    if args.command == 'export':
+        import joblib
+        # Only ever unpickle a file you produced yourself
+        manifest = save_native(joblib.load(args.pickle), args.output)
+        print(f"Wrote {args.output} (sha256 {manifest['sha256'][:12]}, XGBoost {manifest['xgboost_version']})")
+    else:
+        manifest = verify(args.model)
+        print(f"{args.model.name} OK: sha256 {manifest['sha256'][:12]}, {manifest['num_boosted_rounds']} rounds, "
+              f"XGBoost {manifest['xgboost_version']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""Training data preparation and the candidate models from the notebook.
+
+Mirrors notebooks/EDA.ipynb (Notebooks 2–4): numeric gaps are filled with the
+column median, text gaps with the mode, text columns are label-encoded in
+sorted order, and the engineered features are added through the same
+pipeline the app scores with. Offline jobs (cross-validation, retraining)
+build their inputs here so they all train on identical data.
+"""
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.data import load_dataset
+from src.features import FEATURE_ORDER, RAW_FEATURES, feature_matrix
+
+TARGET = 'Churn'
+ID_COLUMN = 'CustomerID'
+RANDOM_STATE = 42
+
+# The four models compared in the notebook, with the notebook's settings
+CANDIDATES = ['Logistic Regression', 'Random Forest', 'Gradient Boosting', 'XGBoost']
+
+# The model the app ships with
+DEPLOYED_MODEL = 'XGBoost'
+
+
+def candidate_model(name: str, n_jobs: int = 1):
+    """A fresh, unfitted instance of candidate `name`."""
+    # Imported here so pages that only need CANDIDATES don't pay for sklearn and xgboost
+    from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier
+    from sklearn.linear_model import LogisticRegression
+    from xgboost import XGBClassifier
+
+    if name == 'Logistic Regression':
+        return LogisticRegression(max_iter=1000)
+    if name == 'Random Forest':
+        return RandomForestClassifier(n_estimators=200, random_state=RANDOM_STATE, n_jobs=n_jobs)
+    if name == 'Gradient Boosting':
+        return GradientBoostingClassifier(random_state=RANDOM_STATE)
+    if name == 'XGBoost':
+        return XGBClassifier(random_state=RANDOM_STATE, eval_metric='logloss', n_jobs=n_jobs)
+    raise ValueError(f"Unknown model {name!r}; expected one of {CANDIDATES}")
+
+
+def impute(df: pd.DataFrame) -> pd.DataFrame:
+    """Fill numeric gaps with the median and text gaps with the mode."""
+    fills = {}
+    for col in df.columns[df.isna().any()]:
+        if pd.api.types.is_numeric_dtype(df[col]):
+            fills[col] = df[col].median()
+        else:
+            fills[col] = df[col].mode()[0]
+    return df.fillna(fills)
+
+
+def encode_categoricals(df: pd.DataFrame) -> pd.DataFrame:
+    """Label-encode every text column (codes follow sorted category order)."""
+    from sklearn.preprocessing import LabelEncoder
+
+    df = df.copy()
+    for col in df.columns:
+        if not pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = LabelEncoder().fit_transform(df[col].astype(str))
+    return df
+
+
+def training_data(df: Optional[pd.DataFrame] = None) -> Tuple[pd.DataFrame, np.ndarray]:
+    """Model inputs (FEATURE_ORDER columns) and churn labels from the raw dataset."""
+    if df is None:
+        df = load_dataset()
+    df = encode_categoricals(impute(df))
+    X = pd.DataFrame(feature_matrix(df[RAW_FEATURES]), columns=FEATURE_ORDER)
+    return X, df[TARGET].to_numpy(dtype=np.int64)
@@ -0,0 +1,141 @@
+"""Build-time preparation and warm start for the deployed app.
+
+Every derived artifact the pages read is content-addressed and rebuilt on
+demand, so without this the first visitor after a deploy paid for parsing the
+workbook, building the cohort cube, scoring the test set and cross-validating
+the candidates. `python -m src.prepare` builds them all ahead of time — the
+Dockerfile runs it during the image build, after checking the model file
+against its manifest so a mismatched model fails the build, not a visitor. Artifacts that are already current
+are left alone, so it is cheap to re-run.
+
+`python -m src.prepare serve [streamlit flags]` is the container entrypoint:
+it loads the model and every artifact into this process's caches, writes
+READY_MARKER, then runs the Streamlit app in the same process, so the first
+page view finds them warm. `python -m src.prepare ready` is the health check —
+healthy only once the marker exists and Streamlit answers its health endpoint.
+
+    python -m src.prepare                                # build every artifact
+    python -m src.prepare serve --server.port=8501       # warm, mark ready, run the app
+    python -m src.prepare ready                          # exit 0 only when warm and serving
+"""
+import argparse
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+from src.data import ROOT
+
+APP_PATH = ROOT / 'streamlit_app.py'
+READY_MARKER = Path(tempfile.gettempdir()) / 'churn-app.ready'
+HEALTH_URL = 'http://localhost:{port}/_stcore/health'
+DEFAULT_PORT = 8501
+
+
+def _timed(steps: dict, name: str, fn):
+    start = time.perf_counter()
+    result = fn()
+    steps[name] = round(time.perf_counter() - start, 3)
+    return result
+
+
+def _cross_validation():
+    from src.crossval import load_results, run_cross_validation, save_results
+    from src.data import dataset_version
+
+    results = load_results()
+    if results is None or results.get('dataset_sha256') != dataset_version():
+        save_results(run_cross_validation())
+
+
+def _import_plotting():
+    import plotly.graph_objects  # noqa: F401 — every page draws with it
+
+
+def prepare() -> dict:
+    """Build (or confirm) every derived artifact; returns seconds per step."""
+    from src.cohort import load_cube
+    from src.data import load_dataset
+    from src.evaluation import load_evaluation
+    from src.model_store import verify
+
+    steps = {}
+    _timed(steps, 'model manifest', verify)
+    _timed(steps, 'columnar dataset', load_dataset)
+    _timed(steps, 'cohort cube', load_cube)
+    _timed(steps, 'evaluation', load_evaluation)
+    _timed(steps, 'cross-validation', _cross_validation)
+    return steps
+
+
+def warm() -> dict:
+    """Load the model and artifacts into this process's caches; returns seconds per step."""
+    import pandas as pd
+
+    from src.cohort import load_cube
+    from src.crossval import load_results
+    from src.data import dataset_version
+    from src.evaluation import TEST_DATA_PATH, load_evaluation
+    from src.explain import explain_one
+    from src.features import RAW_FEATURES
+    from src.inference import get_model, predict_many, predict_one
+
+    steps = {}
+    _timed(steps, 'plotting', _import_plotting)
+    _timed(steps, 'model', get_model)
+    customers = pd.read_csv(TEST_DATA_PATH, nrows=2)[RAW_FEATURES].to_dict('records')
+    # First calls build the booster's predictor and contribution code paths
+    _timed(steps, 'prediction', lambda: (predict_one(customers[0]), predict_many(customers)))
+    _timed(steps, 'explanation', lambda: explain_one(customers[0]))
+    _timed(steps, 'evaluation', load_evaluation)
+    _timed(steps, 'cohort cube', load_cube)
+    _timed(steps, 'cross-validation', lambda: (load_results(), dataset_version()))
+    return steps
+
+
+def serve(streamlit_args: list) -> None:
+    """Warm this process, write READY_MARKER and run the app in it (does not return)."""
+    from streamlit.web import cli
+
+    READY_MARKER.unlink(missing_ok=True)   # left over from a previous run of this container
+    steps = warm()
+    print(f"Warm in {sum(steps.values()):.1f}s: {steps}", flush=True)
+    READY_MARKER.write_text(f"{time.time()}\n")
+    sys.argv = ['streamlit', 'run', str(APP_PATH), *streamlit_args]
+    sys.exit(cli.main())
+
+
+def is_ready(port: int = DEFAULT_PORT, timeout: float = 5.0) -> bool:
+    """True once this container's process is warm and Streamlit answers its health endpoint."""
+    if not READY_MARKER.exists():
+        return False
+    try:
+        with urllib.request.urlopen(HEALTH_URL.format(port=port), timeout=timeout) as response:
+            return response.status == 200
+    except OSError:
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prepare artifacts, or warm-start and health-check the app.")
+    sub = parser.add_subparsers(dest='command')
+    sub.add_parser('serve', help="warm this process, mark it ready, then run the app (extra flags go to streamlit)")
+    ready = sub.add_parser('ready', help="exit 0 only if the app is warm and serving")
+    ready.add_argument('--port', type=int, default=DEFAULT_PORT)
+    args, extra = parser.parse_known_args()
+
+    if args.command == 'serve':
+        serve(extra)
+    elif extra:
+        parser.error(f"unrecognized arguments: {' '.join(extra)}")
+    elif args.command == 'ready':
+        sys.exit(0 if is_ready(args.port) else 1)
+    else:
+        steps = prepare()
+        for name, seconds in steps.items():
+            print(f"{name:<18} {seconds:>8.2f}s")
+
+
+if __name__ == '__main__':
+    main()
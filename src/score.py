@@ -0,0 +1,111 @@
+"""Headless batch scoring — the Batch Analysis page without a browser.
+
+Splits a CSV or Parquet file into chunks, scores them across a process pool
+with the same logic as the page (`src.batch.score_frame`) and writes one
+output partition per chunk plus a summary report.
+
+Usage (from the repo root):
+    python -m src.score customers.csv scored/
+    python -m src.score customers.parquet scored/ --format parquet --workers 8
+    python -m src.score customers.csv scored/ --format csv.gz       # or csv.zst (needs zstandard)
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+
+import pandas as pd
+
+from src.batch import CHUNK_SIZE, BatchSummary, score_frame
+from src.export import EXPORT_FORMATS, available_formats
+from src.features import missing_features
+
+
+def read_chunks(path: Path, chunksize: int):
+    """Yield DataFrames of at most `chunksize` rows from a CSV or Parquet file."""
+    if path.suffix.lower() == '.parquet':
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            sys.exit("Reading Parquet needs pyarrow: pip install pyarrow")
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunksize)
+
+
+def _init_worker():
+    # One booster thread per process — the pool already uses every core
+    from src.inference import configure
+    configure(threads=1, batch_slots=1)
+
+
+def _score_partition(part: int, first_id: int, chunk: pd.DataFrame, output_dir: Path, fmt: str):
+    results, churn_probs = score_frame(chunk, first_id=first_id)
+    path = output_dir / f"part-{part:05d}.{fmt}"
+    if fmt == 'parquet':
+        results.to_parquet(path, index=False)
+    else:
+        # pandas picks gzip / zstd compression from the .gz / .zst extension
+        results.to_csv(path, index=False)
+    summary = BatchSummary()
+    summary.update(results, churn_probs)
+    return summary
+
+
+def score_file(input_path: Path, output_dir: Path, workers: int = None,
+               chunksize: int = CHUNK_SIZE, fmt: str = 'csv') -> BatchSummary:
+    """Score `input_path` into partitioned files under `output_dir` and return the summary."""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    summary = BatchSummary()
+    rows_read = 0
+    pending = set()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        for part, chunk in enumerate(read_chunks(input_path, chunksize)):
+            if part == 0:
+                missing = missing_features(chunk.columns)
+                if missing:
+                    raise ValueError(f"Missing required columns: {', '.join(missing)}")
+            pending.add(pool.submit(_score_partition, part, rows_read + 1, chunk, output_dir, fmt))
+            rows_read += len(chunk)
+            # Keep at most two chunks per worker in flight so memory stays bounded
+            if len(pending) >= workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    summary.merge(future.result())
+                print(f"Scored {summary.total:,} / read {rows_read:,} customers", file=sys.stderr)
+        for future in pending:
+            summary.merge(future.result())
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score a customer file for churn risk.")
+    parser.add_argument('input', type=Path, help="CSV or Parquet file with the 18 raw feature columns")
+    parser.add_argument('output_dir', type=Path, help="Folder for part-NNNNN files and summary.json")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument('--chunksize', type=int, default=CHUNK_SIZE, help="Rows per partition")
+    parser.add_argument('--format', choices=list(EXPORT_FORMATS), default='csv', help="Output partition format")
+    args = parser.parse_args(argv)
+    if args.format not in available_formats():
+        sys.exit(f"--format {args.format} needs an optional package: pip install "
+                 f"{'pyarrow' if args.format == 'parquet' else 'zstandard'}")
+
+    start = time.perf_counter()
+    try:
+        summary = score_file(args.input, args.output_dir, args.workers, args.chunksize, args.format)
+    except ValueError as e:
+        sys.exit(str(e))
+    report = summary.as_dict()
+    report['seconds'] = round(time.perf_counter() - start, 2)
+    with open(args.output_dir / 'summary.json', 'w') as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
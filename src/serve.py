@@ -0,0 +1,303 @@
+"""Local HTTP JSON scoring service for CRM and call-center tooling.
+
+Accepts the same 18 raw columns as Batch Analysis and scores them with the
+same feature pipeline and model (`src.inference.predict_batch_versioned`). Requests that
+arrive together are coalesced into one booster call: the first request opens
+a short latency window and every request queued before it closes — up to
+`max_batch` rows — is scored in the same micro-batch.
+
+    python -m src.serve                               # http://127.0.0.1:8600
+    python -m src.serve --window-ms 5 --max-batch 512
+
+    POST /predict   one customer {"Tenure": 4, ...}, or a list of them
+    GET  /metrics   request latency p50/p90/p99 and the batch size histogram
+    GET  /health
+"""
+import argparse
+import json
+import math
+import queue
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+import numpy as np
+
+from src.batch import risk_level
+from src.features import RAW_FEATURES
+from src.inference import DECISION_THRESHOLD, get_booster, model_version, predict_batch_versioned
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8600
+
+# How long the first request of a batch waits for others to join it
+DEFAULT_WINDOW_MS = 2.0
+DEFAULT_MAX_BATCH = 1024
+
+MAX_BODY_BYTES = 16 << 20
+
+# Request latencies kept for the percentiles
+LATENCY_SAMPLES = 10_000
+
+
+class ServiceStats:
+    """Rolling request latencies and a power-of-two histogram of micro-batch sizes."""
+
+    def __init__(self, samples: int = LATENCY_SAMPLES):
+        self.latencies_ms = deque(maxlen=samples)
+        self.batch_sizes = {}    # bucket exponent -> batches of 2**e .. 2**(e+1)-1 rows
+        self.requests = 0
+        self.rows = 0
+        self.batches = 0
+        self.batched_requests = 0
+        self._lock = threading.Lock()
+
+    def record_request(self, latency_ms: float) -> None:
+        with self._lock:
+            self.requests += 1
+            self.latencies_ms.append(latency_ms)
+
+    def record_batch(self, rows: int, requests: int) -> None:
+        bucket = rows.bit_length() - 1
+        with self._lock:
+            self.batches += 1
+            self.rows += rows
+            self.batch_sizes[bucket] = self.batch_sizes.get(bucket, 0) + 1
+            self.batched_requests += requests
+
+    def report(self) -> dict:
+        with self._lock:
+            latencies = np.array(self.latencies_ms)
+            histogram = {(f'{1 << e}' if e == 0 else f'{1 << e}-{(2 << e) - 1}'): n
+                         for e, n in sorted(self.batch_sizes.items())}
+            requests, rows, batches, batched_requests = (self.requests, self.rows, self.batches,
+                                                         self.batched_requests)
+        latency = {}
+        if len(latencies):
+            latency = {f'p{q}': round(float(np.percentile(latencies, q)), 3) for q in (50, 90, 99)}
+            latency['max'] = round(float(latencies.max()), 3)
+        return {
+            'requests': requests,
+            'rows': rows,
+            'batches': batches,
+            'latency_ms': latency,
+            'batch_size': {
+                'mean_rows': round(rows / batches, 2) if batches else 0.0,
+                'mean_requests': round(batched_requests / batches, 2) if batches else 0.0,
+                'histogram': histogram
+            }
+        }
+
+
+class _Pending:
+    __slots__ = ('rows', 'probs', 'version', 'error', 'done')
+
+    def __init__(self, rows: np.ndarray):
+        self.rows = rows
+        self.probs = None
+        self.version = None
+        self.error = None
+        self.done = threading.Event()
+
+
+class MicroBatcher:
+    """Coalesces concurrent scoring calls into micro-batches on one dispatcher thread."""
+
+    def __init__(self, window_ms: float = DEFAULT_WINDOW_MS, max_batch: int = DEFAULT_MAX_BATCH,
+                 stats: Optional[ServiceStats] = None):
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self.stats = stats or ServiceStats()
+        self._queue = queue.Queue()
+        threading.Thread(target=self._loop, name='micro-batcher', daemon=True).start()
+
+    def score(self, rows: np.ndarray):
+        """(churn probabilities, model version) for an (n, 18) raw-feature array.
+
+        Blocks until its batch is scored; the version is that of the model that scored it.
+        """
+        pending = _Pending(rows)
+        self._queue.put(pending)
+        pending.done.wait()
+        if pending.error is not None:
+            raise pending.error
+        return pending.probs, pending.version
+
+    def _collect(self) -> list:
+        batch = [self._queue.get()]
+        n_rows = len(batch[0].rows)
+        deadline = time.perf_counter() + self.window
+        while n_rows < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            try:
+                # With no window left, still take whatever is already queued
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            batch.append(item)
+            n_rows += len(item.rows)
+        return batch
+
+    def _loop(self) -> None:
+        while True:
+            batch = self._collect()
+            rows = batch[0].rows if len(batch) == 1 else np.concatenate([p.rows for p in batch])
+            try:
+                probs, version = predict_batch_versioned(rows)
+            except Exception as e:
+                for pending in batch:
+                    pending.error = e
+            else:
+                start = 0
+                for pending in batch:
+                    pending.probs = probs[start:start + len(pending.rows)]
+                    pending.version = version
+                    start += len(pending.rows)
+            self.stats.record_batch(len(rows), len(batch))
+            for pending in batch:
+                pending.done.set()
+
+
+def _number(value) -> float:
+    # bool is an int subclass, and float() would take numeric strings — neither is a number here
+    if value is None:
+        return math.nan
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise TypeError(value)
+    return float(value)   # OverflowError for an integer beyond float range
+
+
+def parse_customers(payload):
+    """(n, 18) float64 array from one customer object or a list of them, and whether it was one.
+
+    Raises ValueError naming any missing or non-numeric column (true/false and
+    numeric strings included). A null value is scored as missing, like an
+    empty cell in a Batch Analysis upload.
+    """
+    single = isinstance(payload, dict)
+    customers = [payload] if single else payload
+    if not isinstance(customers, list) or not customers or not all(isinstance(c, dict) for c in customers):
+        raise ValueError("Body must be a customer object or a non-empty list of them")
+    rows = np.empty((len(customers), len(RAW_FEATURES)), dtype=np.float64)
+    for i, customer in enumerate(customers):
+        missing = [name for name in RAW_FEATURES if name not in customer]
+        if missing:
+            raise ValueError(f"Customer {i}: missing required columns: {', '.join(missing)}")
+        try:
+            rows[i] = [_number(customer[name]) for name in RAW_FEATURES]
+        except (TypeError, ValueError, OverflowError):
+            raise ValueError(f"Customer {i}: every column must be a number or null") from None
+    return rows, single
+
+
+def prediction_records(probs: np.ndarray) -> list:
+    levels = risk_level(probs)
+    return [{'churn_probability': round(float(p), 6),
+             'churn_predicted': int(p >= DECISION_THRESHOLD),
+             'risk_level': str(level)} for p, level in zip(probs, levels)]
+
+
+class ScoringHandler(BaseHTTPRequestHandler):
+    # Keep-alive, so a client sending request after request skips the TCP handshake
+    protocol_version = 'HTTP/1.1'
+    batcher: MicroBatcher = None   # set by make_server
+
+    def _send(self, status: int, body: dict) -> None:
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path == '/health':
+            self._send(200, {'status': 'ok', 'model_version': model_version()})
+        elif self.path == '/metrics':
+            self._send(200, self.batcher.stats.report())
+        else:
+            self._send(404, {'error': f'Unknown path {self.path}'})
+
+    def do_POST(self):
+        if self.path != '/predict':
+            self._send(404, {'error': f'Unknown path {self.path}'})
+            return
+        start = time.perf_counter()
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+        except ValueError:
+            length = -1
+        if length < 0 or length > MAX_BODY_BYTES:
+            # The body can't be read past, so this connection can't carry another request
+            self.close_connection = True
+            if length < 0:
+                self._send(400, {'error': 'Content-Length must be a non-negative integer'})
+            else:
+                self._send(413, {'error': f'Body larger than {MAX_BODY_BYTES} bytes'})
+            return
+        try:
+            rows, single = parse_customers(json.loads(self.rfile.read(length)))
+        except json.JSONDecodeError as e:
+            self._send(400, {'error': f'Invalid JSON: {e}'})
+            return
+        except ValueError as e:
+            self._send(400, {'error': str(e)})
+            return
+        try:
+            probs, version = self.batcher.score(rows)
+            predictions = prediction_records(probs)
+        except Exception as e:
+            self._send(500, {'error': f'Scoring failed: {e}'})
+            return
+        body = dict(predictions[0]) if single else {'predictions': predictions}
+        body['model_version'] = version
+        self._send(200, body)
+        self.batcher.stats.record_request((time.perf_counter() - start) * 1000)
+
+    def log_message(self, format, *args):
+        pass  # one stderr line per request would cost more than scoring it
+
+
+class ScoringServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # The default backlog of 5 resets connections as soon as a few clients connect at once
+    request_queue_size = 128
+
+
+def make_server(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                window_ms: float = DEFAULT_WINDOW_MS, max_batch: int = DEFAULT_MAX_BATCH):
+    """A ScoringServer scoring through its own MicroBatcher (as `server.batcher`)."""
+    get_booster()   # load and warm the model before accepting connections
+    batcher = MicroBatcher(window_ms, max_batch)
+    handler = type('Handler', (ScoringHandler,), {'batcher': batcher})
+    server = ScoringServer((host, port), handler)
+    server.batcher = batcher
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve churn predictions over local HTTP JSON.")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--window-ms', type=float, default=DEFAULT_WINDOW_MS,
+                        help="how long a request waits for others to share its batch (default: %(default)s)")
+    parser.add_argument('--max-batch', type=int, default=DEFAULT_MAX_BATCH,
+                        help="rows that close a batch early (default: %(default)s)")
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port, args.window_ms, args.max_batch)
+    print(f"Scoring on http://{args.host}:{server.server_port}/predict "
+          f"(model {model_version()}, window {args.window_ms} ms, max batch {args.max_batch})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(json.dumps(server.batcher.stats.report(), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,213 @@
+"""Reproducible training pipeline — notebooks/EDA.ipynb without the notebook.
+
+Rebuilds the training data from the raw workbook (median/mode imputation,
+label encoding, engineered features — see src.modeling), makes the
+notebook's stratified 80/20 split and fits every candidate model in
+parallel, one process each. XGBoost uses the histogram tree method with
+early stopping on a validation slice of the training set, then is refit on
+the whole training set with the number of rounds it stopped at.
+
+Each model is reported with its wall-clock fit time, single-row and batch
+inference latency and held-out AUC, so a promotion decision can weigh
+serving cost against accuracy:
+
+    python -m src.train                          # train + report, nothing replaced
+    python -m src.train --max-latency-us 500     # only consider models this fast per row
+    python -m src.train --promote                # also replace the served model (src/churn_model.ubj)
+    python -m src.train --xgb-params best.json   # XGBoost settings found by src.tune
+
+Only models exposing an XGBoost booster can be promoted, since the serving
+layer (src.inference) scores through the booster directly.
+"""
+import argparse
+import json
+import os
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+import joblib
+import numpy as np
+
+from src.data import PROCESSED_DIR, dataset_version
+from src.inference import MODEL_PATH
+from src.model_store import save_native
+from src.modeling import CANDIDATES, RANDOM_STATE, candidate_model, training_data
+
+TRAINING_DIR = PROCESSED_DIR / 'training'
+TEST_SIZE = 0.2
+VALIDATION_SIZE = 0.15
+
+# Overrides applied to the notebook's XGBoost settings
+XGB_PARAMS = {'tree_method': 'hist', 'n_estimators': 1000}
+EARLY_STOPPING_ROUNDS = 50
+
+# Single-row predictions timed per model, and rows in each timed batch call
+LATENCY_SAMPLES = 200
+LATENCY_BATCH_ROWS = 1000
+
+
+def split(X, y):
+    """The notebook's stratified train/test split, plus a validation slice of train."""
+    from sklearn.model_selection import train_test_split
+
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=TEST_SIZE, random_state=RANDOM_STATE, stratify=y)
+    X_fit, X_val, y_fit, y_val = train_test_split(
+        X_train, y_train, test_size=VALIDATION_SIZE, random_state=RANDOM_STATE, stratify=y_train)
+    return X_train, X_test, y_train, y_test, X_fit, X_val, y_fit, y_val
+
+
+def _fit_xgboost(n_jobs, params, X_train, y_train, X_fit, X_val, y_fit, y_val):
+    # `n_estimators` (tuned or default) caps the rounds early stopping may use
+    params = {**XGB_PARAMS, **(params or {})}
+    searcher = candidate_model('XGBoost', n_jobs=n_jobs)
+    searcher.set_params(**params, early_stopping_rounds=EARLY_STOPPING_ROUNDS)
+    searcher.fit(X_fit, y_fit, eval_set=[(X_val, y_val)], verbose=False)
+    rounds = searcher.best_iteration + 1
+    # Refit on the full training set so the shipped booster holds exactly `rounds` trees
+    model = candidate_model('XGBoost', n_jobs=n_jobs)
+    model.set_params(**{**params, 'n_estimators': rounds})
+    model.fit(X_train, y_train)
+    return model, {'n_estimators': rounds, 'best_validation_logloss': float(searcher.best_score)}
+
+
+def measure_latency(model, X) -> dict:
+    """Median single-row and per-row batch predict_proba latency, in microseconds."""
+    rows = np.ascontiguousarray(X.to_numpy(dtype=np.float32))
+    batch = rows[:LATENCY_BATCH_ROWS]
+    with warnings.catch_warnings():
+        # Fitted on a DataFrame, timed on raw arrays like the serving path
+        warnings.simplefilter('ignore', UserWarning)
+        model.predict_proba(rows[:1])
+        single = []
+        for i in range(min(LATENCY_SAMPLES, len(rows))):
+            start = time.perf_counter()
+            model.predict_proba(rows[i:i + 1])
+            single.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        model.predict_proba(batch)
+        batch_seconds = time.perf_counter() - start
+    return {
+        'single_row_us': float(np.median(single) * 1e6),
+        'single_row_p99_us': float(np.percentile(single, 99) * 1e6),
+        'batch_per_row_us': float(batch_seconds / len(batch) * 1e6)
+    }
+
+
+def train_candidate(name: str, data: tuple, n_jobs: int = 1, xgb_params: Optional[dict] = None) -> dict:
+    """Fit one candidate and measure it on the held-out test set."""
+    from sklearn.metrics import accuracy_score, roc_auc_score
+
+    X_train, X_test, y_train, y_test, X_fit, X_val, y_fit, y_val = data
+    start = time.perf_counter()
+    if name == 'XGBoost':
+        model, extra = _fit_xgboost(n_jobs, xgb_params, X_train, y_train, X_fit, X_val, y_fit, y_val)
+    else:
+        model, extra = candidate_model(name, n_jobs=n_jobs), {}
+        model.fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - start
+
+    # Latency is measured single-threaded so numbers are comparable between models
+    if hasattr(model, 'get_booster'):
+        model.get_booster().set_param({'nthread': 1})
+    prob = model.predict_proba(X_test)[:, 1]
+    metrics = measure_latency(model, X_test)
+    if hasattr(model, 'get_booster'):
+        # Ship it like the notebook did: threading left to the serving process
+        model.set_params(n_jobs=None)
+        model.get_booster().set_param({'nthread': 0})
+    return {
+        'model': name,
+        'estimator': model,
+        'metrics': {
+            'auc': float(roc_auc_score(y_test, prob)),
+            'accuracy': float(accuracy_score(y_test, prob >= 0.5)),
+            'fit_seconds': fit_seconds,
+            **metrics,
+            **extra
+        }
+    }
+
+
+def train_all(models=CANDIDATES, workers: Optional[int] = None, xgb_params: Optional[dict] = None) -> dict:
+    """Train every candidate in parallel and return {name: result}."""
+    X, y = training_data()
+    data = split(X, y)
+    workers = min(workers or os.cpu_count() or 1, len(models))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {name: pool.submit(train_candidate, name, data, 1, xgb_params) for name in models}
+        return {name: future.result() for name, future in futures.items()}
+
+
+def select_model(results: dict, max_latency_us: Optional[float] = None) -> Optional[str]:
+    """Highest-AUC servable model within the single-row latency budget, if any."""
+    eligible = [
+        name for name, r in results.items()
+        if hasattr(r['estimator'], 'get_booster')
+        and (max_latency_us is None or r['metrics']['single_row_us'] <= max_latency_us)
+    ]
+    if not eligible:
+        return None
+    return max(eligible, key=lambda name: results[name]['metrics']['auc'])
+
+
+def promote(estimator, target: Path = MODEL_PATH) -> None:
+    """Atomically replace the served model and its manifest; the app reloads it on the next request."""
+    save_native(estimator, target)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train the candidate churn models from the raw workbook.")
+    parser.add_argument('--models', nargs='+', default=CANDIDATES, choices=CANDIDATES)
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument('--max-latency-us', type=float, default=None,
+                        help="skip models slower than this per single-row prediction")
+    parser.add_argument('--output', type=Path, default=None,
+                        help="run directory (default: data/processed/training/<timestamp>)")
+    parser.add_argument('--promote', action='store_true', help="replace the served model with the selection")
+    parser.add_argument('--xgb-params', type=Path, default=None,
+                        help="JSON of XGBoost hyperparameters, e.g. best_params.json from src.tune")
+    args = parser.parse_args(argv)
+    xgb_params = json.loads(args.xgb_params.read_text()) if args.xgb_params else None
+
+    output = args.output or TRAINING_DIR / time.strftime('%Y%m%d-%H%M%S')
+    output.mkdir(parents=True, exist_ok=True)
+
+    start = time.perf_counter()
+    results = train_all(args.models, workers=args.workers, xgb_params=xgb_params)
+    wall_seconds = time.perf_counter() - start
+    selected = select_model(results, args.max_latency_us)
+
+    for name, r in results.items():
+        joblib.dump(r['estimator'], output / f"{name.lower().replace(' ', '_')}.pkl")
+    report = {
+        'dataset_sha256': dataset_version(),
+        'random_state': RANDOM_STATE,
+        'wall_seconds': wall_seconds,
+        'max_latency_us': args.max_latency_us,
+        'xgb_params': xgb_params,
+        'selected': selected,
+        'models': {name: r['metrics'] for name, r in results.items()}
+    }
+    (output / 'report.json').write_text(json.dumps(report, indent=2))
+
+    print(f"{'model':20s} {'AUC':>7s} {'fit s':>7s} {'1-row µs':>9s} {'batch µs/row':>13s}")
+    for name, r in results.items():
+        m = r['metrics']
+        flag = '  <- selected' if name == selected else ''
+        print(f"{name:20s} {m['auc']:7.4f} {m['fit_seconds']:7.2f} {m['single_row_us']:9.0f} "
+              f"{m['batch_per_row_us']:13.2f}{flag}")
+    print(f"{wall_seconds:.1f}s wall -> {output}")
+
+    if args.promote:
+        if selected is None:
+            raise SystemExit("No servable model met the latency budget — nothing promoted")
+        promote(results[selected]['estimator'])
+        print(f"Promoted {selected} to {MODEL_PATH}")
+
+
+if __name__ == '__main__':
+    main()
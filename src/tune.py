@@ -0,0 +1,263 @@
+"""Hyperband / successive-halving search over the XGBoost hyperparameters.
+
+Boosting rounds are the budget: many sampled configurations get a few rounds,
+and only the best third of each rung (eta=3) is retrained with three times as
+many. Every rung is evaluated in parallel across a process pool, one
+single-threaded fit per worker.
+
+Configurations are ranked on validation AUC minus a latency penalty
+(`--latency-weight` AUC points per microsecond of single-row
+`inplace_predict`), so a smaller, shallower model that keeps its AUC wins
+over a marginally better but slower one. Latency is timed in the main
+process once a rung's fits have all finished, on one booster thread, so
+it isn't skewed by other trials fitting on the same cores.
+
+Every finished fit is appended to trials.jsonl in the study directory as
+soon as it completes, with the booster saved under models/ until its
+latency has been timed; the timed result is then appended too and the
+booster deleted. Configurations are drawn from a seeded generator per bracket, so
+rerunning an interrupted study re-derives the same candidates, reuses the
+logged results and only fits what is missing.
+
+    python -m src.tune                        # Hyperband, all cores
+    python -m src.tune --method sh            # one successive-halving bracket
+    python -m src.train --xgb-params data/processed/tuning/xgboost/best_params.json
+"""
+import argparse
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from src.data import PROCESSED_DIR, dataset_version
+from src.modeling import RANDOM_STATE, candidate_model, training_data
+from src.train import XGB_PARAMS, split
+
+TUNING_DIR = PROCESSED_DIR / 'tuning'
+
+ETA = 3
+MIN_ROUNDS = 27
+MAX_ROUNDS = 729
+
+# 0.001 AUC is worth 100 µs of single-row latency
+LATENCY_WEIGHT = 1e-5
+
+# Single-row predictions timed per evaluation, after a few untimed ones
+LATENCY_SAMPLES = 100
+LATENCY_WARMUP = 10
+
+_data = None
+
+
+def sample_config(rng: np.random.Generator) -> dict:
+    """One draw from the search space."""
+    return {
+        'max_depth': int(rng.integers(2, 9)),
+        'learning_rate': float(10 ** rng.uniform(-1.7, -0.5)),
+        'min_child_weight': float(10 ** rng.uniform(-1, 1)),
+        'subsample': float(rng.uniform(0.6, 1.0)),
+        'colsample_bytree': float(rng.uniform(0.5, 1.0)),
+        'reg_lambda': float(10 ** rng.uniform(-1, 1))
+    }
+
+
+def brackets(method: str, min_rounds: int, max_rounds: int, eta: int):
+    """(bracket, configs, first-rung rounds) for Hyperband or a single halving bracket."""
+    s_max = int(math.floor(math.log(max_rounds / min_rounds, eta) + 1e-9))
+    for s in range(s_max, -1, -1):
+        n = int(math.ceil((s_max + 1) / (s + 1) * eta ** s))
+        yield s, n, max_rounds * eta ** -s
+        if method == 'sh':
+            return
+
+
+def objective(auc: float, latency_us: float, latency_weight: float) -> float:
+    return auc - latency_weight * latency_us
+
+
+def _init_worker(data):
+    global _data
+    _data = data
+
+
+def _evaluate(trial: str, params: dict, rounds: int) -> dict:
+    from sklearn.metrics import roc_auc_score
+
+    X_fit, X_val, y_fit, y_val = _data
+    model = candidate_model('XGBoost', n_jobs=1)
+    model.set_params(**{**XGB_PARAMS, **params, 'n_estimators': rounds})
+    start = time.perf_counter()
+    model.fit(X_fit, y_fit)
+    fit_seconds = time.perf_counter() - start
+
+    booster = model.get_booster()
+    rows = np.ascontiguousarray(X_val.to_numpy(dtype=np.float32))
+    auc = roc_auc_score(y_val, booster.inplace_predict(rows))
+    # Latency is timed by the parent once the pool is idle — see single_row_latency
+    return {
+        'trial': trial,
+        'rounds': rounds,
+        'params': params,
+        'auc': float(auc),
+        'fit_seconds': fit_seconds,
+        'model': bytes(booster.save_raw(raw_format='ubj'))
+    }
+
+
+def single_row_latency(model: bytes, rows: np.ndarray) -> float:
+    """Median single-row `inplace_predict` time in µs of a saved booster, on one thread."""
+    import xgboost as xgb
+
+    booster = xgb.Booster()
+    booster.load_model(bytearray(model))
+    booster.set_param({'nthread': 1})
+    n = min(LATENCY_SAMPLES, len(rows))
+    for i in range(min(LATENCY_WARMUP, n)):
+        booster.inplace_predict(rows[i:i + 1])
+    timings = np.empty(n)
+    for i in range(n):
+        start = time.perf_counter()
+        booster.inplace_predict(rows[i:i + 1])
+        timings[i] = time.perf_counter() - start
+    return float(np.median(timings) * 1e6)
+
+
+class Study:
+    """Trial log and settings of one tuning run, persisted under TUNING_DIR/<name>."""
+
+    def __init__(self, path: Path, settings: dict, fresh: bool = False):
+        self.path = path
+        self.trials_path = path / 'trials.jsonl'
+        self.models_dir = path / 'models'
+        settings_path = path / 'study.json'
+        path.mkdir(parents=True, exist_ok=True)
+        if fresh:
+            self.trials_path.unlink(missing_ok=True)
+            for model_path in self.models_dir.glob('*.ubj'):
+                model_path.unlink()
+        elif settings_path.exists():
+            saved = json.loads(settings_path.read_text())
+            if saved != settings:
+                raise SystemExit(f"{path} was started with different settings {saved} — "
+                                 "pass --fresh to discard it or --study to start another")
+        settings_path.write_text(json.dumps(settings, indent=2))
+        self.settings = settings
+        self.results = {}
+        if self.trials_path.exists():
+            with open(self.trials_path) as f:
+                for line in f:
+                    # A line cut short by an interrupted write is simply re-run
+                    try:
+                        r = json.loads(line)
+                    except ValueError:
+                        continue
+                    self.results[(r['trial'], r['rounds'])] = r
+        # A fit whose saved booster is gone can't be timed — fit it again
+        for key, r in list(self.results.items()):
+            if 'latency_us' not in r and not self.model_path(*key).exists():
+                del self.results[key]
+
+    def model_path(self, trial: str, rounds: int) -> Path:
+        return self.models_dir / f'{trial}-{rounds}.ubj'
+
+    def record_fit(self, result: dict) -> None:
+        """Persist a fit before its latency is timed, so an interrupted rung keeps it."""
+        model_path = self.model_path(result['trial'], result['rounds'])
+        self.models_dir.mkdir(exist_ok=True)
+        tmp = model_path.with_suffix('.tmp')
+        tmp.write_bytes(result.pop('model'))
+        os.replace(tmp, model_path)
+        self.results[(result['trial'], result['rounds'])] = result
+        with open(self.trials_path, 'a') as f:
+            f.write(json.dumps(result) + '\n')
+
+    def untimed(self) -> list:
+        return [r for r in self.results.values() if 'latency_us' not in r]
+
+    def record(self, result: dict) -> None:
+        result['objective'] = objective(result['auc'], result['latency_us'], self.settings['latency_weight'])
+        self.results[(result['trial'], result['rounds'])] = result
+        with open(self.trials_path, 'a') as f:
+            f.write(json.dumps(result) + '\n')
+
+    def best(self) -> Optional[dict]:
+        weight = self.settings['latency_weight']
+        timed = [r for r in self.results.values() if 'latency_us' in r]
+        return max(timed, key=lambda r: objective(r['auc'], r['latency_us'], weight), default=None)
+
+
+def run_study(study: Study, workers: Optional[int] = None) -> dict:
+    s = study.settings
+    X, y = training_data()
+    _, _, _, _, X_fit, X_val, y_fit, y_val = split(X, y)
+    rows = np.ascontiguousarray(X_val.to_numpy(dtype=np.float32))
+    workers = workers or os.cpu_count() or 1
+    weight = s['latency_weight']
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=((X_fit, X_val, y_fit, y_val),)) as pool:
+        for bracket, n, first_rounds in brackets(s['method'], s['min_rounds'], s['max_rounds'], s['eta']):
+            rng = np.random.default_rng([s['seed'], bracket])
+            survivors = {f"b{bracket}-{i:03d}": sample_config(rng) for i in range(n)}
+            for rung in range(bracket + 1):
+                rounds = int(round(first_rounds * s['eta'] ** rung))
+                pending = {t: p for t, p in survivors.items() if (t, rounds) not in study.results}
+                futures = [pool.submit(_evaluate, t, p, rounds) for t, p in pending.items()]
+                for future in as_completed(futures):
+                    study.record_fit(future.result())
+                # Every fit in the rung is done, so nothing competes for the cores while timing
+                for result in study.untimed():
+                    model_path = study.model_path(result['trial'], result['rounds'])
+                    study.record({**result, 'latency_us': single_row_latency(model_path.read_bytes(), rows)})
+                    model_path.unlink()
+                scored = sorted(survivors, key=lambda t: -objective(
+                    study.results[(t, rounds)]['auc'], study.results[(t, rounds)]['latency_us'], weight))
+                best = study.results[(scored[0], rounds)]
+                print(f"bracket {bracket} rung {rung}: {len(survivors):3d} configs x {rounds:4d} rounds "
+                      f"({len(pending)} fitted) — best AUC {best['auc']:.4f} at {best['latency_us']:.0f} µs")
+                keep = max(1, len(survivors) // s['eta'])
+                survivors = {t: survivors[t] for t in scored[:keep]}
+    return study.best()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tune the XGBoost churn model with Hyperband / successive halving.")
+    parser.add_argument('--method', choices=['hyperband', 'sh'], default='hyperband')
+    parser.add_argument('--study', default='xgboost', help="study name under data/processed/tuning/")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument('--min-rounds', type=int, default=MIN_ROUNDS)
+    parser.add_argument('--max-rounds', type=int, default=MAX_ROUNDS)
+    parser.add_argument('--eta', type=int, default=ETA, help="keep 1/eta of each rung")
+    parser.add_argument('--latency-weight', type=float, default=LATENCY_WEIGHT,
+                        help="AUC points given up per µs of single-row latency")
+    parser.add_argument('--seed', type=int, default=RANDOM_STATE)
+    parser.add_argument('--fresh', action='store_true', help="discard any saved trials for this study")
+    args = parser.parse_args(argv)
+
+    settings = {
+        'method': args.method,
+        'min_rounds': args.min_rounds,
+        'max_rounds': args.max_rounds,
+        'eta': args.eta,
+        'latency_weight': args.latency_weight,
+        'seed': args.seed,
+        'dataset_sha256': dataset_version()
+    }
+    study = Study(TUNING_DIR / args.study, settings, fresh=args.fresh)
+    start = time.perf_counter()
+    best = run_study(study, workers=args.workers)
+
+    best_params = {**best['params'], 'n_estimators': best['rounds']}
+    (study.path / 'best_params.json').write_text(json.dumps(best_params, indent=2))
+    print(f"Best: AUC {best['auc']:.4f}, {best['latency_us']:.0f} µs/row, {best['rounds']} rounds, "
+          f"depth {best['params']['max_depth']} ({time.perf_counter() - start:.0f}s)")
+    print(f"-> {study.path / 'best_params.json'}")
+
+
+if __name__ == '__main__':
+    main()